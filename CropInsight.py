@@ -2,17 +2,13 @@ import streamlit as st
 import joblib
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.lib.units import inch
-from reportlab.lib.colors import HexColor, Color
-from reportlab.lib import colors
+from bisect import bisect_right
 from datetime import datetime
+from functools import partial
+import hashlib
+import hmac
 import io
+import logging
 import os
 
 
@@ -62,6 +58,90 @@ CARD_COLORS = {
     "rainfall":    ("#312e81", "#e0e7ff"),   # dark indigo / light indigo bg
 }
 
+# Trend page feature metadata: gauge maximum, display unit, display name and gauge colour
+FEATURE_MAX = {"N":150,"P":150,"K":200,"ph":14,"temperature":50,"humidity":100,"rainfall":300}
+FEATURE_UNITS = {"N":"","P":"","K":"","ph":"","temperature":"°C","humidity":"%","rainfall":"mm"}
+FEATURE_NAMES = {
+    "N": "Nitrogen", "P": "Phosphorus", "K": "Potassium",
+    "ph": "pH Level", "temperature": "Temperature", 
+    "humidity": "Humidity", "rainfall": "Rainfall"
+}
+FEATURE_CARD_LABELS = {
+    "N": "🧪 Nitrogen (N)", "P": "🧫 Phosphorus (P)", "K": "💊 Potassium (K)",
+    "ph": "⚗️ pH Level", "temperature": "🌡️ Temperature",
+    "humidity": "💧 Humidity", "rainfall": "🌧️ Rainfall",
+}
+GAUGE_COLORS_ROW1 = ["#2ca02c","#ff7f0e","#1f77b4"]
+GAUGE_COLORS_ROW2 = ["#9467bd","#d62728","#8c564b","#e377c2"]
+FEATURES_ROW1 = ["N", "P", "K"]
+FEATURES_ROW2 = ["ph", "temperature", "humidity", "rainfall"]
+FEATURES_ALL = FEATURES_ROW1 + FEATURES_ROW2
+
+CROP_EMOJIS = {
+    "rice":"🌾", "wheat":"🌾", "maize":"🌽", "jute":"🌿",
+    "cotton":"☁️", "coconut":"🥥", "papaya":"🍈", "orange":"🍊",
+    "apple":"🍎", "muskmelon":"🍈", "watermelon":"🍉", "grapes":"🍇",
+    "mango":"🥭", "banana":"🍌", "pomegranate":"💎", "lentil":"🫘",
+    "blackgram":"⚫", "mungbean":"🟢", "mothbeans":"🫘", "pigeonpeas":"🫘",
+    "kidneybeans":"🫘", "chickpea":"🫘", "coffee":"☕"
+}
+
+# Crops the Stage 2 yield model was trained on, and their yield remarks
+STAGE2_CROPS = frozenset({"rice", "maize", "cotton"})
+CROP_REMARKS = {
+    "rice":   "Rice thrives with high nitrogen and consistent water management. "
+              "Your predicted yield reflects optimal flooded conditions and balanced nutrients.",
+    "maize":  "Maize requires balanced NPK nutrients and adequate sunlight. "
+              "Ensure proper spacing and weed control for maximum yield.",
+    "cotton": "Cotton needs sufficient potassium for fiber quality. "
+              "Monitor for pests and ensure adequate irrigation during flowering stage.",
+}
+DEFAULT_CROP_REMARK = "Ensure proper soil fertility and climate management for best yield."
+
+# Index thresholds: bisect_right(BOUNDS, value) picks the tier, so a value equal to a
+# bound falls into the tier above it (e.g. THI 15 is "Optimal", match 90% is "Excellent").
+THI_BOUNDS   = (15, 22, 28)
+SFI_BOUNDS   = (30, 60, 90)
+MATCH_BOUNDS = (60, 75, 90)
+
+# Match score denominators: the full scale of each parameter (keys in FEATURES_ALL order)
+PARAM_RANGES = {
+    "Nitrogen (N)":   150,
+    "Phosphorus (P)": 150,
+    "Potassium (K)":  150,
+    "pH Level":       14,
+    "Temperature":    50,
+    "Humidity":       100,
+    "Rainfall":       300,
+}
+
+REPORT_THI_STATUS = (
+    "Cold Stress — May slow crop growth",
+    "Optimal — Ideal growing conditions",
+    "Warm — Monitor water needs",
+    "Heat Stress — Risk to crop health",
+)
+REPORT_SFI_STATUS = (
+    "Low — Needs fertilization",
+    "Moderate — Adequate nutrients",
+    "Good — Well-balanced soil",
+    "Excellent — Nutrient-rich soil",
+)
+REPORT_MATCH_SUMMARY = (   # (summary, colour)
+    ("Needs Adjustment — Several parameters deviate significantly.",            '#e74c3c'),
+    ("Fair Match — Consider adjusting some parameters for better yield.",       '#f39c12'),
+    ("Good Match — Your conditions suit this crop well.",                       '#27ae60'),
+    ("Excellent Match — Your conditions are very close to the typical values.", '#2ecc71'),
+)
+
+# Overall match banner on the prediction page, one row per MATCH_BOUNDS tier
+MATCH_BANNER = (   # (emoji, heading, message, colour)
+    ("❗", "Needs Adjustment", "Several parameters need adjustment for optimal growth.",      "#e74c3c"),
+    ("⚠️", "Fair Match",       "Consider adjusting some parameters for better yield.",       "#f39c12"),
+    ("👍", "Good Match",       "Your conditions are good for this crop.",                    "#27ae60"),
+    ("🌟", "Excellent Match!", "Your conditions are very close to frequently used values!", "#2ecc71"),
+)
+
 # =============================
 # SESSION STATE INIT
 # =============================
@@ -89,7 +169,8 @@ def load_stage1():
     try:
         model = joblib.load("crop_recommendation_rf.pkl")
         le = joblib.load("label_encoder.pkl")
-        return model, le
+        # Encoded label -> crop name, so predictions need no inverse_transform call
+        return model, tuple(le.classes_)
     except Exception as e:
         st.error(f"Stage 1 model load failed: {e}")
         return None, None
@@ -102,159 +183,417 @@ def load_stage2():
         st.error(f"Stage 2 model load failed: {e}")
         return None
 
+@st.cache_data(show_spinner=False, max_entries=256)
+def predict_crop(N, P, K, temperature, humidity, ph, rainfall):
+    """Stage 1 crop for one input row; the forest is deterministic, so results are cached per input."""
+    stage1_model, crop_classes = load_stage1()
+    # Model feature order; float32 is the dtype the forest predicts on, so sklearn skips the cast copy
+    row = np.array([[N, P, K, temperature, humidity, ph, rainfall]], dtype=np.float32)
+    return crop_classes[int(stage1_model.predict(row)[0])]
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def predict_yield(stage2_items):
+    """Stage 2 yield (t/ha) for one input row given as (column, value) pairs; cached per input."""
+    stage2_model = load_stage2()
+    row = dict(stage2_items)
+    # The pipeline's ColumnTransformer selects columns by name, so it
+    # needs a DataFrame; build the row directly in the fitted column order.
+    stage2_cols = list(stage2_model.feature_names_in_)
+    return stage2_model.predict(pd.DataFrame([[row[c] for c in stage2_cols]], columns=stage2_cols))[0]
+
+# Explicit column types skip pandas' dtype inference. The crop label becomes a category
+# (int8 codes instead of Python strings); floats stay float64 because they are displayed as-is.
+CROP_DATA_DTYPES = {
+    "N": "int16", "P": "int16", "K": "int16",
+    "temperature": "float64", "humidity": "float64", "ph": "float64", "rainfall": "float64",
+    "label": "category",
+}
+
 @st.cache_data
 def load_data():
     try:
-        return pd.read_csv("Crop_recommendation.csv")
+        return pd.read_csv("Crop_recommendation.csv", dtype=CROP_DATA_DTYPES)
     except:
         return None
 
-def half_circle_gauge_card(value, max_value, feature, color, unit=""):
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=value,
-        number={'suffix': unit, 'font': {'size': 22, 'color': 'black'}},
-        title={'text': feature, 'font': {'size': 24, 'color': 'black'}, 'align': 'center'},
-        gauge={
-            'axis': {'range': [0, max_value], 'visible': True, 'tickcolor': 'black'},
-            'bar': {'color': color, 'thickness': 0.35},
-            'bgcolor': "#CFE8C1", 
-            'borderwidth': 1,
-        },
-        domain={'x': [0, 1], 'y': [0, 1]}  
-    ))
-    fig.update_layout(
-        paper_bgcolor="#CFE8C1",
-        plot_bgcolor="#CFE8C1",
-        margin=dict(t=45, b=10, l=10, r=10),
-        height=270
-    )
-    return fig
+@st.cache_data
+def load_crop_summary(features):
+    """Per-crop means, feature correlations, sorted crop names and per-crop mean/median/min/max."""
+    df = load_data()
+    if df is None:
+        return None
+    features = list(features)
+    crop_stats = df.groupby("label", observed=True)[features].agg(["mean", "median", "min", "max"])
+    heatmap_data = crop_stats.xs("mean", axis=1, level=1)
+    return heatmap_data, df[features].corr(), sorted(heatmap_data.index), crop_stats
+
+@st.cache_data
+def load_crop_modes():
+    """Most frequent value of each feature per crop, as {crop: {feature: value}}."""
+    df = load_data()
+    if df is None:
+        return None
+
+    def most_frequent(values):
+        modes = values.mode()
+        return modes.iat[0] if len(modes) > 0 else values.mean()
+
+    return df.groupby("label", observed=True)[FEATURES_ALL].agg(most_frequent).to_dict("index")
+
+@st.cache_resource
+def load_crop_groups():
+    """Dataset rows split by crop label; shared across sessions, so callers must not modify them."""
+    df = load_data()
+    if df is None:
+        return None
+    return {crop: rows.reset_index(drop=True) for crop, rows in df.groupby("label", observed=True)}
+
+# Plotly config for charts that are read, not explored: no hover listeners or modebar
+STATIC_CHART_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+# Layout shared by the About the Dataset heatmap and correlation matrix
+DATASET_CHART_LAYOUT = {"height": 500, "margin": {"l": 20, "r": 20, "t": 30, "b": 20}}
+
+# Plotly's Set2 qualitative palette, one colour per crop in the comparison bar chart
+COMPARISON_COLORS = [
+    "rgb(102,194,165)", "rgb(252,141,98)", "rgb(141,160,203)", "rgb(231,138,195)",
+    "rgb(166,216,84)", "rgb(255,217,47)", "rgb(229,196,148)", "rgb(179,179,179)",
+]
+
+# Layout shared by every gauge card
+GAUGE_LAYOUT = {
+    "paper_bgcolor": "#CFE8C1",
+    "plot_bgcolor": "#CFE8C1",
+    "margin": {"t": 45, "b": 10, "l": 10, "r": 10},
+    "height": 270,
+}
+
+def half_circle_gauge_row(values, max_values, features, colors, units):
+    # One figure per row of gauges, each indicator placed in its own grid cell:
+    # a single chart to serialize and mount instead of one per feature.
+    return {
+        "data": [{
+            "type": "indicator",
+            "mode": "gauge+number",
+            "value": values[f],
+            "number": {'suffix': units[f], 'font': {'size': 22, 'color': 'black'}},
+            "title": {'text': f, 'font': {'size': 24, 'color': 'black'}, 'align': 'center'},
+            "gauge": {
+                'axis': {'range': [0, max_values[f]], 'visible': True, 'tickcolor': 'black'},
+                'bar': {'color': color, 'thickness': 0.35},
+                'bgcolor': "#CFE8C1", 
+                'borderwidth': 1,
+            },
+            "domain": {'row': 0, 'column': i},
+        } for i, (f, color) in enumerate(zip(features, colors))],
+        "layout": {**GAUGE_LAYOUT, "grid": {"rows": 1, "columns": len(features)}},
+    }
+
+
+# N/P/K card rules, laid out like CLIMATE_RULES below.
+NPK_RULES = {
+    "N": ("The Growth Driver — fuels leafy, green, vegetative growth.", (45, 90), (
+        ("🔵 Low",
+         "Very little Nitrogen needed. Over-fertilizing can burn the plant or cause excessive leaf growth at the expense of fruit/grain.",
+         "✅ Use minimal or no N-fertilizer."),
+        ("🟢 Moderate",
+         "Balanced Nitrogen need. Standard fertilization schedules apply.",
+         "✅ Monitor leaf color — yellowing (chlorosis) signals deficiency."),
+        ("🟠 High",
+         "Heavy feeder. Multiple N-fertilizer applications (split dosing) needed throughout the season.",
+         "✅ Use split-dose N-fertilizer at key growth stages."),
+    )),
+    "P": ("The Root & Flower Builder — drives root development, flowering, and seed formation.", (45, 90), (
+        ("🔵 Low",
+         "Minimal phosphorus needed. Common in root/tuber crops. Excess P can lock out Zinc and Iron.",
+         "✅ Avoid over-application; background soil P is sufficient."),
+        ("🟢 Moderate",
+         "Standard P requirements.",
+         "✅ Apply basal phosphate fertilizer before sowing or planting."),
+        ("🟠 High",
+         "High demand, often seen in fruiting or flowering crops.",
+         "✅ Incorporate bone meal, superphosphate, or DAP at planting time."),
+    )),
+    "K": ("The Quality & Stress Shield — improves fruit quality, disease resistance, and drought tolerance.", (60, 120), (
+        ("🔵 Low",
+         "Low K demand. Background soil potassium levels are sufficient for this crop.",
+         "✅ No additional K application needed under normal conditions."),
+        ("🟢 Moderate",
+         "Moderate K need.",
+         "✅ A single basal application of MOP or SOP at planting is typically sufficient."),
+        ("🟠 High",
+         "High demand, especially in fruit crops. Impacts yield and sweetness.",
+         "✅ Regular K top-dressing throughout the growing season."),
+    )),
+}
 
 
 def get_npk_card(feature, value):
     """Return (status_label, text_color, bg_color, role, meaning, action) for N/P/K."""
     text_color, bg_color = CARD_COLORS[feature]
-
-    if feature == "N":
-        role = "The Growth Driver — fuels leafy, green, vegetative growth."
-        if value < 45:
-            return ("🔵 Low", text_color, bg_color, role,
-                    "Very little Nitrogen needed. Over-fertilizing can burn the plant or cause excessive leaf growth at the expense of fruit/grain.",
-                    "✅ Use minimal or no N-fertilizer.")
-        elif value <= 90:
-            return ("🟢 Moderate", text_color, bg_color, role,
-                    "Balanced Nitrogen need. Standard fertilization schedules apply.",
-                    "✅ Monitor leaf color — yellowing (chlorosis) signals deficiency.")
-        else:
-            return ("🟠 High", text_color, bg_color, role,
-                    "Heavy feeder. Multiple N-fertilizer applications (split dosing) needed throughout the season.",
-                    "✅ Use split-dose N-fertilizer at key growth stages.")
-
-    elif feature == "P":
-        role = "The Root & Flower Builder — drives root development, flowering, and seed formation."
-        if value < 45:
-            return ("🔵 Low", text_color, bg_color, role,
-                    "Minimal phosphorus needed. Common in root/tuber crops. Excess P can lock out Zinc and Iron.",
-                    "✅ Avoid over-application; background soil P is sufficient.")
-        elif value <= 90:
-            return ("🟢 Moderate", text_color, bg_color, role,
-                    "Standard P requirements.",
-                    "✅ Apply basal phosphate fertilizer before sowing or planting.")
-        else:
-            return ("🟠 High", text_color, bg_color, role,
-                    "High demand, often seen in fruiting or flowering crops.",
-                    "✅ Incorporate bone meal, superphosphate, or DAP at planting time.")
-
-    else:  # K
-        role = "The Quality & Stress Shield — improves fruit quality, disease resistance, and drought tolerance."
-        if value < 60:
-            return ("🔵 Low", text_color, bg_color, role,
-                    "Low K demand. Background soil potassium levels are sufficient for this crop.",
-                    "✅ No additional K application needed under normal conditions.")
-        elif value <= 120:
-            return ("🟢 Moderate", text_color, bg_color, role,
-                    "Moderate K need.",
-                    "✅ A single basal application of MOP or SOP at planting is typically sufficient.")
-        else:
-            return ("🟠 High", text_color, bg_color, role,
-                    "High demand, especially in fruit crops. Impacts yield and sweetness.",
-                    "✅ Regular K top-dressing throughout the growing season.")
+    role, (low, high), tiers = NPK_RULES[feature]
+    status_label, meaning, action = tiers[0 if value < low else 1 if value <= high else 2]
+    return (status_label, text_color, bg_color, role, meaning, action)
+
+
+# Climate card rules: (role, (low, high), tiers). A value below `low` selects the first
+# tier, up to and including `high` the second, anything above the third.
+# Each tier is (status_label, meaning, action); meaning is formatted with the value.
+CLIMATE_RULES = {
+    "ph": ("Soil Acidity / Alkalinity", (6, 7.5), (
+        ("🔴 Acidic",
+         "pH {value} — Acidic soil. Aluminum and Manganese may reach toxic levels. Phosphorus becomes unavailable to plants.",
+         "✅ Apply agricultural lime (calcium carbonate) to raise pH."),
+        ("🟢 Neutral",
+         "pH {value} — The sweet spot for most crops. Nutrient availability is at its peak and microbial activity is healthy.",
+         "✅ Maintain current soil management practices."),
+        ("🔵 Alkaline",
+         "pH {value} — Alkaline soil. Iron, Zinc, and Manganese become less available, risking deficiency symptoms.",
+         "✅ Apply sulfur or acidifying fertilizers (e.g. ammonium sulfate) to lower pH."),
+    )),
+    "temperature": ("Metabolic Activity Rate", (20, 30), (
+        ("❄️ Cool",
+         "{value}°C — This crop prefers cool conditions. Warm-season crops will fail or produce poorly at this temperature.",
+         "✅ Ideal for highland or temperate-zone cultivation."),
+        ("🌡️ Moderate",
+         "{value}°C — Optimal range for the majority of tropical and subtropical crops.",
+         "✅ No special temperature management required."),
+        ("🔥 Warm",
+         "{value}°C — This crop thrives in heat. Cool-season crops planted here will bolt, wilt, or die.",
+         "✅ Ensure adequate water availability to offset high evapotranspiration."),
+    )),
+    "humidity": ("Atmospheric Moisture", (40, 70), (
+        ("🏜️ Dry",
+         "{value}% — Low atmospheric moisture. The crop is drought-adapted. High-humidity crops planted here will suffer water stress.",
+         "✅ Supplemental irrigation may be necessary during dry periods."),
+        ("💧 Moderate",
+         "{value}% — A comfortable moisture level for most crops. Disease risk is manageable.",
+         "✅ Standard fungicide and pest schedules are sufficient."),
+        ("💦 Humid",
+         "{value}% — High moisture environment adapted to humid tropics. Fungal diseases (blight, mildew) are a major risk.",
+         "✅ Monitor closely and apply preventive fungicides regularly."),
+    )),
+    "rainfall": ("Total Water Input", (100, 200), (
+        ("🌵 Low",
+         "{value}mm — Drought-tolerant crop or short growing season. Low annual rainfall regions can support this crop.",
+         "✅ Minimal or no irrigation required."),
+        ("🌧️ Moderate",
+         "{value}mm — Standard rainfall requirement suitable for semi-arid to sub-humid regions.",
+         "✅ Supplemental irrigation during dry spells may improve yield."),
+        ("⛈️ High",
+         "{value}mm — This crop demands significant water. Waterlogging is a risk without proper drainage.",
+         "✅ Ensure good drainage; in low-rainfall areas heavy irrigation infrastructure is needed."),
+    )),
+}
 
 
 def get_climate_card(feature, value):
     """Return (status_label, text_color, bg_color, role, meaning, action) for climate features."""
     text_color, bg_color = CARD_COLORS[feature]
+    role, (low, high), tiers = CLIMATE_RULES[feature]
+    status_label, meaning, action = tiers[0 if value < low else 1 if value <= high else 2]
+    return (status_label, text_color, bg_color, role, meaning.format(value=value), action)
 
-    if feature == "ph":
-        role = "Soil Acidity / Alkalinity"
-        if value < 6:
-            return ("🔴 Acidic", text_color, bg_color, role,
-                    f"pH {value} — Acidic soil. Aluminum and Manganese may reach toxic levels. Phosphorus becomes unavailable to plants.",
-                    "✅ Apply agricultural lime (calcium carbonate) to raise pH.")
-        elif value <= 7.5:
-            return ("🟢 Neutral", text_color, bg_color, role,
-                    f"pH {value} — The sweet spot for most crops. Nutrient availability is at its peak and microbial activity is healthy.",
-                    "✅ Maintain current soil management practices.")
-        else:
-            return ("🔵 Alkaline", text_color, bg_color, role,
-                    f"pH {value} — Alkaline soil. Iron, Zinc, and Manganese become less available, risking deficiency symptoms.",
-                    "✅ Apply sulfur or acidifying fertilizers (e.g. ammonium sulfate) to lower pH.")
-
-    elif feature == "temperature":
-        role = "Metabolic Activity Rate"
-        if value < 20:
-            return ("❄️ Cool", text_color, bg_color, role,
-                    f"{value}°C — This crop prefers cool conditions. Warm-season crops will fail or produce poorly at this temperature.",
-                    "✅ Ideal for highland or temperate-zone cultivation.")
-        elif value <= 30:
-            return ("🌡️ Moderate", text_color, bg_color, role,
-                    f"{value}°C — Optimal range for the majority of tropical and subtropical crops.",
-                    "✅ No special temperature management required.")
-        else:
-            return ("🔥 Warm", text_color, bg_color, role,
-                    f"{value}°C — This crop thrives in heat. Cool-season crops planted here will bolt, wilt, or die.",
-                    "✅ Ensure adequate water availability to offset high evapotranspiration.")
-
-    elif feature == "humidity":
-        role = "Atmospheric Moisture"
-        if value < 40:
-            return ("🏜️ Dry", text_color, bg_color, role,
-                    f"{value}% — Low atmospheric moisture. The crop is drought-adapted. High-humidity crops planted here will suffer water stress.",
-                    "✅ Supplemental irrigation may be necessary during dry periods.")
-        elif value <= 70:
-            return ("💧 Moderate", text_color, bg_color, role,
-                    f"{value}% — A comfortable moisture level for most crops. Disease risk is manageable.",
-                    "✅ Standard fungicide and pest schedules are sufficient.")
-        else:
-            return ("💦 Humid", text_color, bg_color, role,
-                    f"{value}% — High moisture environment adapted to humid tropics. Fungal diseases (blight, mildew) are a major risk.",
-                    "✅ Monitor closely and apply preventive fungicides regularly.")
-
-    else:  # rainfall
-        role = "Total Water Input"
-        if value < 100:
-            return ("🌵 Low", text_color, bg_color, role,
-                    f"{value}mm — Drought-tolerant crop or short growing season. Low annual rainfall regions can support this crop.",
-                    "✅ Minimal or no irrigation required.")
-        elif value <= 200:
-            return ("🌧️ Moderate", text_color, bg_color, role,
-                    f"{value}mm — Standard rainfall requirement suitable for semi-arid to sub-humid regions.",
-                    "✅ Supplemental irrigation during dry spells may improve yield.")
-        else:
-            return ("⛈️ High", text_color, bg_color, role,
-                    f"{value}mm — This crop demands significant water. Waterlogging is a risk without proper drainage.",
-                    "✅ Ensure good drainage; in low-rainfall areas heavy irrigation infrastructure is needed.")
+
+def render_feature_card(label, card, value_text, narrow=False):
+    """Render a get_npk_card/get_climate_card result as a status card; narrow cards get tighter padding."""
+    status_label, text_color, bg_color, role, meaning, action = card
+    pad_x, badge_pad_x, meaning_size = ("18px", "12px", "12px") if narrow else ("20px", "14px", "12.5px")
+    st.markdown(f"""
+        <div style='
+            background-color:{bg_color};
+            border-left:6px solid {text_color};
+            border-radius:16px;
+            padding:20px {pad_x} 16px {pad_x};
+            box-shadow:0 4px 14px rgba(0,0,0,0.09);
+            height:260px;
+            box-sizing:border-box;
+            overflow:hidden;
+            display:flex;
+            flex-direction:column;
+            justify-content:space-between;
+        '>
+            <div>
+                <div style='font-size:16px;font-weight:800;color:{text_color};margin-bottom:2px;'>
+                    {label}
+                </div>
+                <div style='font-size:11px;color:#555;font-style:italic;margin-bottom:10px;'>
+                    {role}
+                </div>
+                <div style='
+                    display:inline-flex;
+                    align-items:center;
+                    gap:6px;
+                    background:{text_color};
+                    color:white;
+                    font-size:12px;
+                    font-weight:700;
+                    border-radius:24px;
+                    padding:4px {badge_pad_x};
+                    margin-bottom:10px;
+                '>
+                    {status_label}&nbsp;|&nbsp;{value_text}
+                </div>
+                <div style='font-size:{meaning_size};color:#222;line-height:1.55;'>
+                    {meaning}
+                </div>
+            </div>
+            <div style='
+                font-size:12px;
+                color:{text_color};
+                font-weight:700;
+                border-top:1px solid {text_color}33;
+                padding-top:8px;
+                margin-top:8px;
+            '>
+                {action}
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+@st.cache_resource(show_spinner=False)
+def load_pdf_styles():
+    """Build the report's paragraph and table styles once; they never change between reports."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    body_style = ParagraphStyle(
+        'CustomBody', parent=styles['Normal'],
+        fontSize=11, leading=16, spaceAfter=12, alignment=TA_JUSTIFY
+    )
+
+    def header_cmds(background, font_size, padding):
+        return [
+            ('BACKGROUND',    (0, 0), (-1,  0), background),
+            ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
+            ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
+            ('FONTSIZE',      (0, 0), (-1,  0), font_size),
+            ('BOTTOMPADDING', (0, 0), (-1,  0), padding),
+        ]
+
+    def body_cmds(font_size, padding):
+        return [
+            ('FONTSIZE',      (0, 1), (-1, -1), font_size),
+            ('TOPPADDING',    (0, 1), (-1, -1), padding),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), padding),
+        ]
+
+    return {
+        # ------------------------------------------------------------------
+        # Paragraph styles
+        # ------------------------------------------------------------------
+        "title": ParagraphStyle(
+            'CustomTitle', parent=styles['Heading1'],
+            fontSize=26, textColor=HexColor('#2c5282'),
+            spaceAfter=10, alignment=TA_CENTER, fontName='Helvetica-Bold'
+        ),
+        "subtitle": ParagraphStyle(
+            'Subtitle', parent=styles['Normal'],
+            fontSize=12, textColor=HexColor('#666666'),
+            alignment=TA_CENTER, spaceAfter=30
+        ),
+        "section_header": ParagraphStyle(
+            'SectionHeader', parent=styles['Heading2'],
+            fontSize=18, textColor=HexColor('#2c5282'),
+            spaceAfter=15, spaceBefore=20, fontName='Helvetica-Bold'
+        ),
+        "subsection_header": ParagraphStyle(
+            'SubsectionHeader', parent=styles['Heading3'],
+            fontSize=14, textColor=HexColor('#4a5568'),
+            spaceAfter=10, spaceBefore=15, fontName='Helvetica-Bold'
+        ),
+        "body": body_style,
+        "crop_name": ParagraphStyle('CropName', parent=body_style, fontSize=20,
+                                    textColor=HexColor('#2c5282'), alignment=TA_CENTER),
+        "small_bold": ParagraphStyle('SmallBold', parent=styles['Normal'],
+                                     fontSize=10, fontName='Helvetica-Bold',
+                                     textColor=HexColor('#4a5568'), spaceAfter=4),
+        "formula_note": ParagraphStyle('FormulaNote', parent=styles['Normal'],
+                                       fontSize=9, textColor=HexColor('#555555'),
+                                       leading=13, spaceAfter=10),
+        "match_text": ParagraphStyle('MatchText', parent=body_style, fontSize=11, alignment=TA_CENTER),
+        "yield_value": ParagraphStyle('YieldValue', parent=body_style, fontSize=20,
+                                      textColor=HexColor('#2c5282'), alignment=TA_CENTER),
+        "footer": ParagraphStyle('Footer', parent=body_style, fontSize=9,
+                                 textColor=HexColor('#666666'), alignment=TA_CENTER),
+
+        # ------------------------------------------------------------------
+        # Table styles
+        # ------------------------------------------------------------------
+        "input_table": TableStyle([
+            *header_cmds(HexColor('#2c5282'), 12, 12),
+            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN',         (1, 0), (-1, -1), 'CENTER'),
+            ('BACKGROUND',    (0, 1), (-1, -1), HexColor('#f7fafc')),
+            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f7fafc')]),
+            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+            *body_cmds(11, 8),
+        ]),
+        "indices_table": TableStyle([
+            *header_cmds(HexColor('#4a5568'), 11, 10),
+            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN',         (1, 0), (1,  -1), 'CENTER'),
+            ('BACKGROUND',    (0, 1), (-1, -1), colors.white),
+            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+            *body_cmds(10, 8),
+        ]),
+        "legend_table": TableStyle([
+            *header_cmds(HexColor('#4a5568'), 10, 8),
+            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
+            *body_cmds(9, 6),
+            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [HexColor('#f0fff4'), HexColor('#fffff0'), HexColor('#fff5f5')]),
+            ('GRID',          (0, 0), (-1, -1), 0.5, HexColor('#e2e8f0')),
+        ]),
+        "match_table": TableStyle([
+            *header_cmds(HexColor('#4a5568'), 11, 10),
+            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN',         (1, 0), (-1, -1), 'CENTER'),
+            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f7fafc')]),
+            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+            *body_cmds(10, 7),
+        ]),
+        "units_table": TableStyle([
+            *header_cmds(HexColor('#1b5e20'), 10, 10),
+            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
+            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [HexColor('#f1f8e9'), HexColor('#e8f5e9'), HexColor('#dcedc8')]),
+            ('GRID',          (0, 0), (-1, -1), 0.5, HexColor('#c8e6c9')),
+            *body_cmds(9, 7),
+        ]),
+        "farm_table": TableStyle([
+            *header_cmds(HexColor('#2c5282'), 11, 10),
+            ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
+            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f0f4ff')]),
+            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+            *body_cmds(10, 8),
+        ]),
+    }
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_crop_prediction_pdf(
     N, P, K, ph, temperature, humidity, rainfall,
-    recommended_crop, thi, sfi, parameter_matches, overall_match,
+    recommended_crop, thi, sfi, parameter_matches, overall_match, generated_at,
     soil_moisture=None, soil_type=None, sunlight_hours=None,
     irrigation_type=None, fertilizer_used=None, pesticide_used=None,
     predicted_yield=None
 ):
-    """Generate PDF report in memory and return BytesIO object"""
+    """Generate PDF report in memory and return its bytes; identical inputs are served from cache.
+
+    `generated_at` is the header timestamp, passed in so it is part of the cache key.
+    """
+    # reportlab is only needed for report downloads, so it is imported here
+    # rather than on every page load.
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, KeepTogether
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import HexColor
 
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
@@ -264,48 +603,16 @@ def create_crop_prediction_pdf(
     )
 
     story = []
-    styles = getSampleStyleSheet()
-    
-    # ------------------------------------------------------------------
-    # Custom styles
-    # ------------------------------------------------------------------
-    title_style = ParagraphStyle(
-        'CustomTitle', parent=styles['Heading1'],
-        fontSize=26, textColor=HexColor('#2c5282'),
-        spaceAfter=10, alignment=TA_CENTER, fontName='Helvetica-Bold'
-    )
-    subtitle_style = ParagraphStyle(
-        'Subtitle', parent=styles['Normal'],
-        fontSize=12, textColor=HexColor('#666666'),
-        alignment=TA_CENTER, spaceAfter=30
-    )
-    section_header = ParagraphStyle(
-        'SectionHeader', parent=styles['Heading2'],
-        fontSize=18, textColor=HexColor('#2c5282'),
-        spaceAfter=15, spaceBefore=20, fontName='Helvetica-Bold'
-    )
-    subsection_header = ParagraphStyle(
-        'SubsectionHeader', parent=styles['Heading3'],
-        fontSize=14, textColor=HexColor('#4a5568'),
-        spaceAfter=10, spaceBefore=15, fontName='Helvetica-Bold'
-    )
-    body_style = ParagraphStyle(
-        'CustomBody', parent=styles['Normal'],
-        fontSize=11, leading=16, spaceAfter=12, alignment=TA_JUSTIFY
-    )
-    center_style = ParagraphStyle(
-        'Center', parent=styles['Normal'],
-        fontSize=11, leading=16, spaceAfter=8, alignment=TA_CENTER
-    )
-    note_style = ParagraphStyle(
-        'Note', parent=styles['Normal'],
-        fontSize=9, textColor=HexColor('#666666'),
-        alignment=TA_CENTER, spaceAfter=6
-    )
-    info_box_style = ParagraphStyle(
-        'InfoBox', parent=styles['Normal'],
-        fontSize=10, textColor=HexColor('#1a365d'),
-        leading=15, spaceAfter=4
+    pdf_styles = load_pdf_styles()
+    title_style       = pdf_styles["title"]
+    subtitle_style    = pdf_styles["subtitle"]
+    section_header    = pdf_styles["section_header"]
+    subsection_header = pdf_styles["subsection_header"]
+    body_style        = pdf_styles["body"]
+    # Spacers are stateless within one build, so each gap size is created once
+    # per report and reused wherever it appears.
+    gap_xs, gap_sm, gap_md, gap_lg, gap_xl = (
+        Spacer(1, h*inch) for h in (0.1, 0.15, 0.2, 0.3, 0.4)
     )
 
     # ------------------------------------------------------------------
@@ -313,7 +620,7 @@ def create_crop_prediction_pdf(
     # ------------------------------------------------------------------
     story.append(Paragraph("Crop Insight Report", title_style))
     story.append(Paragraph(
-        f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
+        f"Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}",
         subtitle_style
     ))
 
@@ -332,44 +639,19 @@ def create_crop_prediction_pdf(
         ['Rainfall',       f'{rainfall:.1f}',    'mm'],
     ]
     input_table = Table(input_data, colWidths=[2.8*inch, 1.8*inch, 1.4*inch])
-    input_table.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#2c5282')),
-        ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-        ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-        ('FONTSIZE',      (0, 0), (-1,  0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1,  0), 12),
-        ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN',         (1, 0), (-1, -1), 'CENTER'),
-        ('BACKGROUND',    (0, 1), (-1, -1), HexColor('#f7fafc')),
-        ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f7fafc')]),
-        ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-        ('FONTSIZE',      (0, 1), (-1, -1), 11),
-        ('TOPPADDING',    (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
+    input_table.setStyle(pdf_styles["input_table"])
     story.append(input_table)
-    story.append(Spacer(1, 0.3*inch))
+    story.append(gap_lg)
 
     # ------------------------------------------------------------------
     # SECTION 2 — Recommended Crop
     # ------------------------------------------------------------------
     story.append(Paragraph("2. Recommended Crop", section_header))
-    crop_emojis = {
-        "rice":"Rice", "wheat":"Wheat", "maize":"Maize", "jute":"Jute",
-        "cotton":"Cotton", "coconut":"Coconut", "papaya":"Papaya",
-        "orange":"Orange", "apple":"Apple", "muskmelon":"Muskmelon",
-        "watermelon":"Watermelon", "grapes":"Grapes", "mango":"Mango",
-        "banana":"Banana", "pomegranate":"Pomegranate", "lentil":"Lentil",
-        "blackgram":"Blackgram", "mungbean":"Mungbean", "mothbeans":"Mothbeans",
-        "pigeonpeas":"Pigeonpeas", "kidneybeans":"Kidneybeans",
-        "chickpea":"Chickpea", "coffee":"Coffee",
-    }
     story.append(Paragraph(
         f"<b>{recommended_crop.upper()}</b>",
-        ParagraphStyle('CropName', parent=body_style, fontSize=20,
-                       textColor=HexColor('#2c5282'), alignment=TA_CENTER)
+        pdf_styles["crop_name"]
     ))
-    story.append(Spacer(1, 0.1*inch))
+    story.append(gap_xs)
     story.append(Paragraph(
         f"Based on your soil and environmental parameters, <b>{recommended_crop}</b> "
         f"is identified as the most suitable crop. This recommendation takes into "
@@ -377,30 +659,15 @@ def create_crop_prediction_pdf(
         f"required for this species to thrive.",
         body_style
     ))
-    story.append(Spacer(1, 0.2*inch))
+    story.append(gap_md)
 
     # ------------------------------------------------------------------
     # SECTION 3 — Environmental Indices
     # ------------------------------------------------------------------
     story.append(Paragraph("3. Environmental Indices", section_header))
 
-    if thi < 15:
-        thi_status = "Cold Stress — May slow crop growth"
-    elif thi < 22:
-        thi_status = "Optimal — Ideal growing conditions"
-    elif thi < 28:
-        thi_status = "Warm — Monitor water needs"
-    else:
-        thi_status = "Heat Stress — Risk to crop health"
-
-    if sfi < 30:
-        sfi_status = "Low — Needs fertilization"
-    elif sfi < 60:
-        sfi_status = "Moderate — Adequate nutrients"
-    elif sfi < 90:
-        sfi_status = "Good — Well-balanced soil"
-    else:
-        sfi_status = "Excellent — Nutrient-rich soil"
+    thi_status = REPORT_THI_STATUS[bisect_right(THI_BOUNDS, thi)]
+    sfi_status = REPORT_SFI_STATUS[bisect_right(SFI_BOUNDS, sfi)]
 
     indices_data = [
         ['Index', 'Value', 'Status'],
@@ -408,22 +675,9 @@ def create_crop_prediction_pdf(
         ['Soil Fertility Index (SFI)',        f'{sfi:.1f}', sfi_status],
     ]
     indices_table = Table(indices_data, colWidths=[2.5*inch, 1.0*inch, 2.5*inch])
-    indices_table.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#4a5568')),
-        ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-        ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-        ('FONTSIZE',      (0, 0), (-1,  0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1,  0), 10),
-        ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN',         (1, 0), (1,  -1), 'CENTER'),
-        ('BACKGROUND',    (0, 1), (-1, -1), colors.white),
-        ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-        ('FONTSIZE',      (0, 1), (-1, -1), 10),
-        ('TOPPADDING',    (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
+    indices_table.setStyle(pdf_styles["indices_table"])
     story.append(indices_table)
-    story.append(Spacer(1, 0.3*inch))
+    story.append(gap_lg)
 
     # ------------------------------------------------------------------
     # SECTION 4 — Parameter Match Analysis
@@ -433,18 +687,14 @@ def create_crop_prediction_pdf(
     # Explain the scoring method used
     story.append(Paragraph(
         "How the Match % is calculated:",
-        ParagraphStyle('SmallBold', parent=styles['Normal'],
-                       fontSize=10, fontName='Helvetica-Bold',
-                       textColor=HexColor('#4a5568'), spaceAfter=4)
+        pdf_styles["small_bold"]
     ))
     story.append(Paragraph(
         "Match % = (1 - |Your Value - Typical Value| / Parameter Range) x 100. "
         "The difference is divided by the full parameter scale range (e.g. N: 0-150, pH: 0-14) "
         "rather than by the typical value itself, so scores remain fair and comparable "
         "across all parameters regardless of their magnitude.",
-        ParagraphStyle('FormulaNote', parent=styles['Normal'],
-                       fontSize=9, textColor=HexColor('#555555'),
-                       leading=13, spaceAfter=10)
+        pdf_styles["formula_note"]
     ))
 
     # Score legend
@@ -455,82 +705,31 @@ def create_crop_prediction_pdf(
         ['< 50%',   'Large deviation — this parameter may limit crop growth'],
     ]
     legend_table = Table(legend_data, colWidths=[1.1*inch, 4.9*inch])
-    legend_table.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#4a5568')),
-        ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-        ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-        ('FONTSIZE',      (0, 0), (-1,  0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1,  0), 8),
-        ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-        ('FONTSIZE',      (0, 1), (-1, -1), 9),
-        ('TOPPADDING',    (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('ROWBACKGROUNDS',(0, 1), (-1, -1), [HexColor('#f0fff4'), HexColor('#fffff0'), HexColor('#fff5f5')]),
-        ('GRID',          (0, 0), (-1, -1), 0.5, HexColor('#e2e8f0')),
-    ]))
+    legend_table.setStyle(pdf_styles["legend_table"])
     story.append(legend_table)
-    story.append(Spacer(1, 0.2*inch))
+    story.append(gap_md)
 
     # Match scores table
     match_data = [['Parameter', 'Your Value', 'Typical Value', 'Match %', 'Diff']]
-    PARAM_RANGES = {
-        "Nitrogen (N)":   150,
-        "Phosphorus (P)": 150,
-        "Potassium (K)":  150,
-        "pH Level":       14,
-        "Temperature":    50,
-        "Humidity":       100,
-        "Rainfall":       300,
-    }
-    for param_name, (user_val, opt_val, match_pct) in parameter_matches.items():
-        diff = user_val - opt_val
-        diff_str = f"+{diff:.1f}" if diff > 0 else f"{diff:.1f}"
-        # Colour-code match % text
-        if match_pct >= 80:
-            pct_label = f"{match_pct:.0f}%  Good"
-        elif match_pct >= 50:
-            pct_label = f"{match_pct:.0f}%  Fair"
-        else:
-            pct_label = f"{match_pct:.0f}%  Low"
-        match_data.append([
+    match_data += [
+        [
             param_name,
             f'{user_val:.1f}',
             f'{opt_val:.1f}',
             f'{match_pct:.0f}%',
-            diff_str,
-        ])
+            f'{user_val - opt_val:+.1f}' if user_val > opt_val else f'{user_val - opt_val:.1f}',
+        ]
+        for param_name, (user_val, opt_val, match_pct) in parameter_matches.items()
+    ]
 
     match_table = Table(match_data, colWidths=[2.0*inch, 1.1*inch, 1.2*inch, 0.9*inch, 0.8*inch])
-    match_table.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#4a5568')),
-        ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-        ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-        ('FONTSIZE',      (0, 0), (-1,  0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1,  0), 10),
-        ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN',         (1, 0), (-1, -1), 'CENTER'),
-        ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f7fafc')]),
-        ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-        ('FONTSIZE',      (0, 1), (-1, -1), 10),
-        ('TOPPADDING',    (0, 1), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 7),
-    ]))
+    match_table.setStyle(pdf_styles["match_table"])
     story.append(match_table)
-    story.append(Spacer(1, 0.2*inch))
+    story.append(gap_md)
 
     # Overall match banner
-    if overall_match >= 90:
-        match_summary = "Excellent Match — Your conditions are very close to the typical values."
-        match_color   = HexColor('#2ecc71')
-    elif overall_match >= 75:
-        match_summary = "Good Match — Your conditions suit this crop well."
-        match_color   = HexColor('#27ae60')
-    elif overall_match >= 60:
-        match_summary = "Fair Match — Consider adjusting some parameters for better yield."
-        match_color   = HexColor('#f39c12')
-    else:
-        match_summary = "Needs Adjustment — Several parameters deviate significantly."
-        match_color   = HexColor('#e74c3c')
+    match_summary, match_hex = REPORT_MATCH_SUMMARY[bisect_right(MATCH_BOUNDS, overall_match)]
+    match_color = HexColor(match_hex)
 
     story.append(Paragraph(
         f"<b>Overall Match Score: {overall_match:.1f}%</b>",
@@ -539,18 +738,15 @@ def create_crop_prediction_pdf(
     ))
     story.append(Paragraph(
         match_summary,
-        ParagraphStyle('MatchText', parent=body_style, fontSize=11, alignment=TA_CENTER)
+        pdf_styles["match_text"]
     ))
 
     # ------------------------------------------------------------------
     # SECTION 5 — Yield Prediction (Stage 2, optional)
     # ------------------------------------------------------------------
     if predicted_yield is not None:
-        story.append(PageBreak())
-        story.append(Paragraph("5. Yield Prediction Analysis", section_header))
-
-        # Additional farm parameters table
-        story.append(Paragraph("Additional Farm Parameters", subsection_header))
+        # Additional farm parameters table; kept with its headings so the
+        # section starts on a fresh page only when it does not fit
         stage2_data = [
             ['Parameter',        'Value',                    'Unit'],
             ['Soil Moisture',    f'{soil_moisture}',         '%'],
@@ -561,32 +757,21 @@ def create_crop_prediction_pdf(
             ['Pesticide Used',   f'{pesticide_used:.1f}',   'kg/hectare'],
         ]
         stage2_table = Table(stage2_data, colWidths=[2.5*inch, 1.8*inch, 1.7*inch])
-        stage2_table.setStyle(TableStyle([
-            ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#2c5282')),
-            ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-            ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-            ('FONTSIZE',      (0, 0), (-1,  0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1,  0), 12),
-            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN',         (1, 0), (-1, -1), 'CENTER'),
-            ('BACKGROUND',    (0, 1), (-1, -1), HexColor('#f7fafc')),
-            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f7fafc')]),
-            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-            ('FONTSIZE',      (0, 1), (-1, -1), 11),
-            ('TOPPADDING',    (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        stage2_table.setStyle(pdf_styles["input_table"])
+        story.append(KeepTogether([
+            Paragraph("5. Yield Prediction Analysis", section_header),
+            Paragraph("Additional Farm Parameters", subsection_header),
+            stage2_table,
         ]))
-        story.append(stage2_table)
-        story.append(Spacer(1, 0.3*inch))
+        story.append(gap_lg)
 
         # Predicted yield headline
         story.append(Paragraph("Predicted Yield Result", subsection_header))
         story.append(Paragraph(
             f"<b>{predicted_yield:.2f} t/ha  ({predicted_yield * 1000:,.0f} kg/ha)</b>",
-            ParagraphStyle('YieldValue', parent=body_style, fontSize=20,
-                           textColor=HexColor('#2c5282'), alignment=TA_CENTER)
+            pdf_styles["yield_value"]
         ))
-        story.append(Spacer(1, 0.15*inch))
+        story.append(gap_sm)
 
         # ── Unit explanation table ──────────────────────────────────────
         story.append(Paragraph("Understanding the Yield Units", subsection_header))
@@ -597,21 +782,9 @@ def create_crop_prediction_pdf(
             ['Yield (t/ha)',        'Tonnes harvested per hectare of farmland',  f'This crop: {predicted_yield:.2f} t/ha'],
         ]
         units_table = Table(units_data, colWidths=[1.5*inch, 2.2*inch, 2.3*inch])
-        units_table.setStyle(TableStyle([
-            ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#1b5e20')),
-            ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-            ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-            ('FONTSIZE',      (0, 0), (-1,  0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1,  0), 10),
-            ('ALIGN',         (0, 0), (-1, -1), 'LEFT'),
-            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [HexColor('#f1f8e9'), HexColor('#e8f5e9'), HexColor('#dcedc8')]),
-            ('GRID',          (0, 0), (-1, -1), 0.5, HexColor('#c8e6c9')),
-            ('FONTSIZE',      (0, 1), (-1, -1), 9),
-            ('TOPPADDING',    (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 7),
-        ]))
+        units_table.setStyle(pdf_styles["units_table"])
         story.append(units_table)
-        story.append(Spacer(1, 0.2*inch))
+        story.append(gap_md)
 
         # ── Scale-to-farm breakdown ─────────────────────────────────────
         story.append(Paragraph("Scale to Your Farm Size", subsection_header))
@@ -623,66 +796,323 @@ def create_crop_prediction_pdf(
             ['10 hectares',f'{predicted_yield * 10:.2f} t', f'{predicted_yield * 10000:,.0f} kg'],
         ]
         farm_table = Table(farm_data, colWidths=[1.8*inch, 2.0*inch, 2.2*inch])
-        farm_table.setStyle(TableStyle([
-            ('BACKGROUND',    (0, 0), (-1,  0), HexColor('#2c5282')),
-            ('TEXTCOLOR',     (0, 0), (-1,  0), colors.white),
-            ('FONTNAME',      (0, 0), (-1,  0), 'Helvetica-Bold'),
-            ('FONTSIZE',      (0, 0), (-1,  0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1,  0), 10),
-            ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
-            ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, HexColor('#f0f4ff')]),
-            ('GRID',          (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-            ('FONTSIZE',      (0, 1), (-1, -1), 10),
-            ('TOPPADDING',    (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
+        farm_table.setStyle(pdf_styles["farm_table"])
         story.append(farm_table)
-        story.append(Spacer(1, 0.2*inch))
+        story.append(gap_md)
 
         # Crop-specific remark
-        crop_remarks = {
-            "rice":   "Rice thrives with high nitrogen and consistent water management. "
-                      "Your predicted yield reflects optimal flooded conditions and balanced nutrients.",
-            "maize":  "Maize requires balanced NPK nutrients and adequate sunlight. "
-                      "Ensure proper spacing and weed control for maximum yield.",
-            "cotton": "Cotton needs sufficient potassium for fiber quality. "
-                      "Monitor for pests and ensure adequate irrigation during flowering stage.",
-        }
-        remark = crop_remarks.get(recommended_crop.lower(), "Ensure proper soil fertility and climate management for best yield.")
+        remark = CROP_REMARKS.get(recommended_crop.lower(), DEFAULT_CROP_REMARK)
         story.append(Paragraph(remark, body_style))
 
     # ------------------------------------------------------------------
     # FOOTER
     # ------------------------------------------------------------------
-    story.append(Spacer(1, 0.4*inch))
+    story.append(gap_xl)
     story.append(Paragraph(
         "<i>Note: Predictions are based on historical data patterns and should be used "
         "as a decision-support tool, not a guarantee of harvest outcome.</i>",
-        ParagraphStyle('Footer', parent=body_style, fontSize=9,
-                       textColor=HexColor('#666666'), alignment=TA_CENTER)
+        pdf_styles["footer"]
     ))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
+
+
+def report_pdf_or_error(error_label, **report):
+    """Build a report for a deferred download button; on failure, log it and return a one-page error PDF.
+
+    Streamlit runs a callable `data` outside the script, where st.error is not shown,
+    so the error has to travel in the downloaded file instead.
+    """
+    try:
+        return create_crop_prediction_pdf(**report)
+    except Exception as e:
+        message = f"{error_label}: {str(e)}"
+        logging.getLogger(__name__).exception(message)
+        from reportlab.pdfgen import canvas
+
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer)
+        pdf.drawString(72, 720, message)
+        pdf.save()
+        return buffer.getvalue()
     
 
 # =============================
 # UI SECTIONS
 # =============================
+# Demo account from the README (password stored as its SHA-256 hex digest). A deployment
+# can replace it with an [auth] section (username, password_sha256) in .streamlit/secrets.toml.
+DEFAULT_LOGIN = {
+    "username": "user",
+    "password_sha256": "e606e38b0d8c19b24cf0ee3808183162ea7cd63ff7912dbb22b5e803286b4446",
+}
+
+def check_credentials(username, password):
+    try:
+        login = st.secrets.get("auth", DEFAULT_LOGIN)
+    except FileNotFoundError:
+        login = DEFAULT_LOGIN
+    password_sha256 = hashlib.sha256(password.encode()).hexdigest()
+    # compare_digest on both fields so a failed login takes the same time wherever it differs
+    user_ok = hmac.compare_digest(username.encode(), login["username"].encode())
+    password_ok = hmac.compare_digest(password_sha256, login["password_sha256"])
+    return user_ok and password_ok
+
 def show_login():
     st.title("🔐 Crop Insight Login")
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
-    if st.button("Login"):
-        if username == "user" and password == "user123":
+    # A form holds the typed values client-side, so the script reruns once on submit
+    with st.form("login_form"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        submitted = st.form_submit_button("Login")
+    if submitted:
+        if check_credentials(username, password):
             st.session_state.logged_in = True
             st.session_state.page = "trend"
             st.rerun()
         else:
             st.error("❌ Invalid credentials")
 
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_histogram_figure(crop, feature, mean, median):
+    """Distribution of one feature for one crop, with mean and median lines."""
+    import plotly.graph_objects as go
+
+    # Bin on the server so the chart carries 30 bars instead of every sample row
+    counts, edges = np.histogram(load_crop_groups()[crop][feature].to_numpy(), bins=30)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#4B371C'
+    ))
+    fig.update_layout(
+        title=f"{FEATURE_NAMES[feature]} Distribution for {crop}",
+        xaxis_title=feature,
+        yaxis_title="count",
+        bargap=0
+    )
+    fig.add_vline(x=mean, line_dash="dash", line_color="red", annotation_text=f"Mean: {mean:.1f}")
+    fig.add_vline(x=median, line_dash="dot", line_color="blue", annotation_text=f"Median: {median:.1f}")
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_bar_figure(crops, values, feature_name, metric_label):
+    """Bar chart of one parameter across crops, one coloured trace per crop."""
+    return {
+        "data": [{
+            "type": "bar",
+            "x": [crop],
+            "y": np.array([value]),
+            "text": np.array([value]),   # numeric, so plotly.js prints 4 rather than "4.0"
+            "name": crop,
+            "legendgroup": crop,
+            "marker": {"color": color},
+            "texttemplate": "%{text}",
+            "textposition": "outside",
+            "hovertemplate": f"Crop=%{{x}}<br>{feature_name}=%{{text}}<extra></extra>",
+        } for crop, value, color in zip(crops, values, COMPARISON_COLORS)],
+        "layout": {
+            "title": {"text": f"{feature_name} Comparison Across Crops ({metric_label})"},
+            "barmode": "relative",
+            "showlegend": False,
+            "height": 450,
+            "xaxis": {"title": {"text": "Crop"}, "categoryorder": "array", "categoryarray": list(crops)},
+            "yaxis": {"title": {"text": feature_name}},
+        },
+    }
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_radar_figure(crops, normalized, categories, metric_label):
+    """Radar chart of normalized crop profiles, one row of `normalized` per crop."""
+    return {
+        "data": [{
+            "type": "scatterpolar",
+            "r": list(values),
+            "theta": list(categories),
+            "fill": "toself",
+            "name": crop,
+            "line": {"width": 2},
+        } for crop, values in zip(crops, normalized)],
+        "layout": {
+            "polar": {"radialaxis": {"visible": True, "range": [0, 1], "tickformat": ".0%"}},
+            "showlegend": True,
+            "title": {"text": f"Normalized Multi-Parameter Comparison ({metric_label})"},
+            "height": 500,
+        },
+    }
+
+@st.fragment
+def render_comparison_chart(comp_df, crops, features, feature_names, feature_max, metric_label):
+    """Render the bar or radar chart comparing the selected crops."""
+    col_viz1, col_viz2 = st.columns([1, 2])
+    with col_viz1:
+        selected_feature = st.selectbox(
+            "Select parameter to visualize",
+            [feature_names[f] for f in features],
+            help="Choose which parameter to compare visually"
+        )
+    with col_viz2:
+        chart_type = st.radio(
+            "Chart Type",
+            ["Bar Chart", "Radar Chart"],
+            horizontal=True
+        )
+    
+    if chart_type == "Bar Chart":
+        fig = build_bar_figure(
+            tuple(comp_df["Crop"]), tuple(comp_df[selected_feature].tolist()), selected_feature, metric_label
+        )
+        with st.expander("📊 **Understanding the Bar Chart**"):
+            st.markdown("""
+                * This chart compares **Single Parameter Focus** requirements across the selected crops.
+                * Use this to see exact numerical differences for a specific metric. 
+                * It is the best way to determine which crop is the "most" or "least" demanding for a single nutrient.
+            """)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    else:
+        categories = [feature_names[f] for f in features]
+        # Each crop's values as a fraction of the feature's scale, one row per crop
+        normalized = comp_df[categories].to_numpy() / [feature_max[f] for f in features]
+        fig = build_radar_figure(tuple(crops), tuple(map(tuple, normalized.tolist())), tuple(categories), metric_label)
+        with st.expander("📊 **Understanding the Radar Chart**"):
+            st.markdown("""
+                    * This chart **normalizes** all values (0% to 100%) so you can compare temperature, pH, and nutrients on the same scale.
+                    * **What to look for:** If the shapes of two crops overlap significantly, they share a similar "biological fingerprint" and likely grow well in the same regions.
+            """)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def render_crop_comparison(selected_crop, emoji, features, crop_list, crop_stats):
+    """Render the Crop Comparison tab for the selected crop."""
+    st.markdown(f"### Compare **{selected_crop.upper()}** {emoji} with Other Crops")
+    st.info("Select up to 3 crops to compare their optimal growing conditions side-by-side.")
+
+    st.markdown("### 📊 Statistical Measure Selection")
+    col_t2_radio, col_t2_exp = st.columns([1, 2])
+
+    with col_t2_radio:
+        central_tendency_tab2 = st.radio(
+            "Choose calculation method:",
+            ("Mean", "Median"),
+            key="tab2_central_tendency",
+            help="Select how to calculate central values for the comparison crops"
+        )
+
+    with col_t2_exp:
+        with st.expander("ℹ️ **What's the difference?**"):
+            st.markdown("""
+            **Mean (Average)** 📊
+            - Shows the average requirement across all samples for each crop
+            - **Best for:** Data without extreme outliers
+
+            **Median (Middle Value)** 📍
+            - Shows the typical middle-ground requirement, less affected by unusual farming conditions or measurement errors
+            - **Best for:** Data with outliers or skewed distributions
+
+            ---
+
+            **🎯 When to use each:**
+
+            | Situation | Recommended |
+            |-----------|-------------|
+            | Normal distribution | **Mean** |
+            | Data with outliers | **Median** |
+            | Extreme values present | **Median** |
+            | Symmetric data | **Mean** |
+
+            > 💡 **Tip:** Changing this selector only affects the Crop Comparison tab. The Crop Overview tab has its own independent selector.
+            """)
+
+    # Per-crop means or medians (crops x features), read from the cached crop statistics
+    metric_label_tab2 = central_tendency_tab2
+    crop_values = crop_stats.xs(metric_label_tab2.lower(), axis=1, level=1)
+    calculated_values_tab2 = crop_values.loc[selected_crop].round(1)
+
+    compare_crops = st.multiselect(
+        "🌾 Select crops to compare with " + selected_crop,
+        [c for c in crop_list if c != selected_crop],
+        max_selections=3,
+        help="Choose crops you want to compare"
+    )
+
+    if compare_crops:
+        comp_crops = [selected_crop] + compare_crops
+        comp_df = crop_values.loc[comp_crops, features].round(1).rename(columns=FEATURE_NAMES).reset_index(drop=True)
+        comp_df.insert(0, "Crop", comp_crops)
+
+        st.markdown(f"#### 📋 Comparison Table in Farm Environment Profile ({metric_label_tab2})")
+        st.dataframe(
+            comp_df, 
+            use_container_width=True, 
+            hide_index=True,
+            column_config={
+                "Crop": st.column_config.TextColumn("🌱 Crop", width="medium"),
+            }
+        )
+
+        st.markdown("---")
+        st.markdown("#### 🌡️ Farm Environment Visual Comparison")
+
+        render_comparison_chart(
+            comp_df, comp_crops,
+            features, FEATURE_NAMES, FEATURE_MAX, metric_label_tab2
+        )
+
+        st.markdown("---")
+        st.markdown("#### 🔍 Key Differences")
+        with st.expander("ℹ️ **How to interpret these differences**"):
+            st.markdown(f"""
+            This section highlights where the comparison crops **deviate significantly** from your primary choice, **{selected_crop.upper()}**.
+
+            * **The 20% Rule:** We only display a difference if it is greater than **20%**. This filters out minor variations and focuses on the factors that truly change how you manage the field.
+            * **🔺 (Red Up):** Indicates the comparison crop requires **significantly more** of this resource.
+            * **🔻 (Red Down):** Indicates the comparison crop requires **significantly less**.
+
+            **Why this matters:** If you see a **+80% Nitrogen** difference, switching to that crop would require a complete overhaul of your fertilization schedule.
+            """)
+            st.latex(r"Percentage\ Change = \frac{Comparison\ Mean - Selected\ Mean}{Selected\ Mean} \times 100")
+
+        # Compared crops x features: difference from the selected crop, as a percentage of
+        # its value (0 where that value is 0), and the mean difference relative to each scale
+        selected_vec = calculated_values_tab2[features].to_numpy()
+        diff_mat = crop_values.loc[compare_crops, features].to_numpy() - selected_vec
+        pct_mat = np.divide(diff_mat, selected_vec, out=np.zeros_like(diff_mat), where=selected_vec != 0) * 100
+        similarity = (1 - (np.abs(diff_mat) / [FEATURE_MAX[f] for f in features]).mean(axis=1)) * 100
+
+        diff_cols = st.columns(len(compare_crops))
+        for idx, crop in enumerate(compare_crops):
+            with diff_cols[idx]:
+                crop_emoji = CROP_EMOJIS.get(crop.lower(), "🌱")
+                st.markdown(f"**{crop_emoji} {crop.upper()} vs {selected_crop.upper()}**")
+                # First three features (in display order) that differ by more than 20%
+                shown = np.flatnonzero(np.abs(pct_mat[idx]) > 20)[:3]
+                for i in shown:
+                    pct_diff = pct_mat[idx, i]
+                    if diff_mat[idx, i] > 0:
+                        st.caption(f"🔺 {FEATURE_NAMES[features[i]]}: +{pct_diff:.0f}%")
+                    else:
+                        st.caption(f"🔻 {FEATURE_NAMES[features[i]]}: {pct_diff:.0f}%")
+                if len(shown) == 0:
+                    st.caption("Similar conditions")
+
+        st.markdown("---")
+        st.markdown("#### 🎯 Similarity Analysis")
+        for crop, crop_similarity in zip(compare_crops, similarity):
+           crop_emoji = CROP_EMOJIS.get(crop.lower(), "🌱")
+           st.progress(crop_similarity / 100)
+           st.caption(f"{crop_emoji} **{crop}** is {crop_similarity:.1f}% similar to **{selected_crop}**")
+
+    else:
+        st.warning("👆 Select at least one crop to start comparing!")
+
+@st.fragment
 def show_trend():
+    import plotly.express as px
+
     st.title("📊 Agricultural Data Trends")           
     st.markdown("Welcome to the **Crop Insight**. This platform leverages historical soil and climate data to identify optimal growing conditions and crop alternatives.")
     st.info("💡 The dashboard analyzes the relationship between soil nutrients, environmental factors, and pH levels. It is designed to support data-driven decision-making for sustainable farming.")
@@ -692,26 +1122,16 @@ def show_trend():
         return
 
     # ----------------------------
-    # Features, max values, units, colors
+    # Features
     # ----------------------------
-    features_row1 = ["N", "P", "K"]
-    features_row2 = ["ph", "temperature", "humidity", "rainfall"]
-    
-    feature_max = {"N":150,"P":150,"K":200,"ph":14,"temperature":50,"humidity":100,"rainfall":300}
-    feature_units = {"N":"","P":"","K":"","ph":"","temperature":"°C","humidity":"%","rainfall":"mm"}
-    feature_names = {
-        "N": "Nitrogen", "P": "Phosphorus", "K": "Potassium",
-        "ph": "pH Level", "temperature": "Temperature", 
-        "humidity": "Humidity", "rainfall": "Rainfall"
-    }
-    
-    colors_row1 = ["#2ca02c","#ff7f0e","#1f77b4"]
-    colors_row2 = ["#9467bd","#d62728","#8c564b","#e377c2"]
+    heatmap_data, corr_matrix, crop_list, crop_stats = load_crop_summary(tuple(FEATURES_ALL))
 
     # ----------------------------
     # Data Insights Section 
     # ----------------------------
-    with st.expander("📊 **About the Dataset**"):
+    # An expander's body runs on every rerun even while collapsed; behind a toggle
+    # the dataset charts are only built once the user asks to see them.
+    if st.toggle("📊 **About the Dataset**", key="show_about_dataset"):
         st.markdown("Explore the underlying relationships and requirements across all crop types.")
         
         st.subheader("🔥 Feature Heatmap Across All Crops")
@@ -725,14 +1145,13 @@ def show_trend():
                     **💡 Pro-Tip:** Use this to find "extreme" crops. For example, you can quickly spot which crops need the most rainfall or the highest Nitrogen levels compared to all others.
         """)
         
-        heatmap_data = df.groupby("label")[features_row1 + features_row2].mean()
         fig_heat = px.imshow(
             heatmap_data.T,
             labels=dict(x="Crop", y="Feature", color="Value"),
             aspect="auto",
             color_continuous_scale="RdYlGn"
         )
-        fig_heat.update_layout(height=500, margin=dict(l=20, r=20, t=30, b=20))
+        fig_heat.update_layout(DATASET_CHART_LAYOUT)
         st.plotly_chart(fig_heat, use_container_width=True)
         
         st.divider()
@@ -749,7 +1168,6 @@ def show_trend():
                     **💡 Why it matters:** Highly correlated features provide the same information — useful for feature selection in your ML model.
         """)
         
-        corr_matrix = df[features_row1 + features_row2].corr()
         fig_corr = px.imshow(
             corr_matrix,
             text_auto='.2f',
@@ -757,37 +1175,29 @@ def show_trend():
             color_continuous_scale="RdBu_r",
             labels=dict(color="Correlation")
         )
-        fig_corr.update_layout(height=500, margin=dict(l=20, r=20, t=30, b=20))
-        st.plotly_chart(fig_corr, use_container_width=True)
+        fig_corr.update_layout(DATASET_CHART_LAYOUT)
+        st.plotly_chart(fig_corr, use_container_width=True, config=STATIC_CHART_CONFIG)
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("🌾 Total Crops", df["label"].nunique())
+        st.metric("🌾 Total Crops", len(crop_list))
     with col2:
         st.metric("📋 Total Samples", len(df))
     with col3:
-        st.metric("📊 Features", len(features_row1 + features_row2))
+        st.metric("📊 Features", len(FEATURES_ALL))
     with col4:
-        avg_samples = len(df) / df["label"].nunique()
+        avg_samples = len(df) / len(crop_list)
         st.metric("📈 Avg Samples/Crop", f"{avg_samples:.0f}")
 
     selected_crop = st.selectbox(
             "Select Crop to Analyze", 
-            sorted(df["label"].unique()),
+            crop_list,
             help="Choose a crop to view its optimal growing conditions"
     )
     
-    crop_df = df[df["label"] == selected_crop]
-
-    crop_emojis = {
-        "rice":"🌾", "wheat":"🌾", "maize":"🌽", "jute":"🌿",
-        "cotton":"☁️", "coconut":"🥥", "papaya":"🍈", "orange":"🍊",
-        "apple":"🍎", "muskmelon":"🍈", "watermelon":"🍉", "grapes":"🍇",
-        "mango":"🥭", "banana":"🍌", "pomegranate":"💎", "lentil":"🫘",
-        "blackgram":"⚫", "mungbean":"🟢", "mothbeans":"🫘", "pigeonpeas":"🫘",
-        "kidneybeans":"🫘", "chickpea":"🫘", "coffee":"☕"
-    }
-    emoji = crop_emojis.get(selected_crop.lower(), "🌱")
+    selected_stats = crop_stats.loc[selected_crop]
+
+    emoji = CROP_EMOJIS.get(selected_crop.lower(), "🌱")
     
     st.markdown(f"""
         <div style='background: linear-gradient(135deg, #4B371C 0%, #3C280D 100%); 
@@ -810,15 +1220,15 @@ def show_trend():
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown(f"""
-                    **🌡️ Temperature Range:** {crop_df['temperature'].min():.1f}°C - {crop_df['temperature'].max():.1f}°C
+                    **🌡️ Temperature Range:** {selected_stats[('temperature', 'min')]:.1f}°C - {selected_stats[('temperature', 'max')]:.1f}°C
                     
-                    **💧 Humidity Range:** {crop_df['humidity'].min():.1f}% - {crop_df['humidity'].max():.1f}%
+                    **💧 Humidity Range:** {selected_stats[('humidity', 'min')]:.1f}% - {selected_stats[('humidity', 'max')]:.1f}%
                 """)
             with col2:
                 st.markdown(f"""
-                    **🌧️ Rainfall Range:** {crop_df['rainfall'].min():.1f}mm - {crop_df['rainfall'].max():.1f}mm
+                    **🌧️ Rainfall Range:** {selected_stats[('rainfall', 'min')]:.1f}mm - {selected_stats[('rainfall', 'max')]:.1f}mm
     
-                    **⚗️ pH Range:** {crop_df['ph'].min():.1f} - {crop_df['ph'].max():.1f}
+                    **⚗️ pH Range:** {selected_stats[('ph', 'min')]:.1f} - {selected_stats[('ph', 'max')]:.1f}
                 """)
 
         st.markdown("---")
@@ -855,207 +1265,67 @@ def show_trend():
                 """)
         
         if central_tendency == "Mean":
-            calculated_values = crop_df[features_row1 + features_row2].mean().round(1)
+            calculated_values = selected_stats.xs("mean", level=1).round(1)
             metric_label = "Mean"
         else:
-            calculated_values = crop_df[features_row1 + features_row2].median().round(1)
+            calculated_values = selected_stats.xs("median", level=1).round(1)
             metric_label = "Median"
         
         # ----------------------------
-        # Row 1: N, P, K — Gauges + Cards
+        # Row 1: N, P, K / Row 2: pH, Temperature, Humidity, Rainfall — Gauges + Cards
         # ----------------------------
-        st.subheader(f"🌱 Soil Nutrients (NPK) — {metric_label} Values")
-
-        cols1 = st.columns(len(features_row1), gap="medium")
-        for i, f in enumerate(features_row1):
-            with cols1[i]:
-                st.markdown(
-                    f"<div style='background-color:#CFE8C1; padding:15px; border-radius:18px; box-shadow: 0 4px 10px rgba(0,0,0,0.08);'>",
-                    unsafe_allow_html=True
-                )
-                fig = half_circle_gauge_card(calculated_values[f], feature_max[f], f, colors_row1[i], feature_units[f])
-                st.plotly_chart(fig, use_container_width=True)
-                st.markdown(
-                    f"<p style='text-align:center;font-weight:bold;color:black;'>{calculated_values[f]}{feature_units[f]} / {feature_max[f]}{feature_units[f]}</p>",
-                    unsafe_allow_html=True
-                )
-                st.markdown("</div>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        npk_labels = {"N": "🧪 Nitrogen (N)", "P": "🧫 Phosphorus (P)", "K": "💊 Potassium (K)"}
-        npk_card_cols = st.columns(3, gap="medium")
-        for i, f in enumerate(features_row1):
-            status_label, text_color, bg_color, role, meaning, action = get_npk_card(f, calculated_values[f])
-            with npk_card_cols[i]:
-                st.markdown(f"""
-                    <div style='
-                        background-color:{bg_color};
-                        border-left:6px solid {text_color};
-                        border-radius:16px;
-                        padding:20px 20px 16px 20px;
-                        box-shadow:0 4px 14px rgba(0,0,0,0.09);
-                        height:260px;
-                        box-sizing:border-box;
-                        overflow:hidden;
-                        display:flex;
-                        flex-direction:column;
-                        justify-content:space-between;
-                    '>
-                        <div>
-                            <div style='font-size:16px;font-weight:800;color:{text_color};margin-bottom:2px;'>
-                                {npk_labels[f]}
-                            </div>
-                            <div style='font-size:11px;color:#555;font-style:italic;margin-bottom:10px;'>
-                                {role}
-                            </div>
-                            <div style='
-                                display:inline-flex;
-                                align-items:center;
-                                gap:6px;
-                                background:{text_color};
-                                color:white;
-                                font-size:12px;
-                                font-weight:700;
-                                border-radius:24px;
-                                padding:4px 14px;
-                                margin-bottom:10px;
-                            '>
-                                {status_label}&nbsp;|&nbsp;{calculated_values[f]}
-                            </div>
-                            <div style='font-size:12.5px;color:#222;line-height:1.55;'>
-                                {meaning}
-                            </div>
-                        </div>
-                        <div style='
-                            font-size:12px;
-                            color:{text_color};
-                            font-weight:700;
-                            border-top:1px solid {text_color}33;
-                            padding-top:8px;
-                            margin-top:8px;
-                        '>
-                            {action}
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
+        card_rows = (
+            ("🌱 Soil Nutrients (NPK)", FEATURES_ROW1, GAUGE_COLORS_ROW1, get_npk_card),
+            ("🌤️ Climate & Soil Conditions", FEATURES_ROW2, GAUGE_COLORS_ROW2, get_climate_card),
+        )
+        for heading, features, colors, get_card in card_rows:
+            st.subheader(f"{heading} — {metric_label} Values")
 
-        st.markdown("---")
+            st.plotly_chart(
+                half_circle_gauge_row(calculated_values, FEATURE_MAX, features, colors, FEATURE_UNITS),
+                use_container_width=True,
+                config=STATIC_CHART_CONFIG
+            )
+            for col, f in zip(st.columns(len(features), gap="medium"), features):
+                with col:
+                    st.markdown(
+                        f"<div style='background-color:#CFE8C1; padding:15px; border-radius:18px; box-shadow: 0 4px 10px rgba(0,0,0,0.08);'>"
+                        f"<p style='text-align:center;font-weight:bold;color:black;'>{calculated_values[f]}{FEATURE_UNITS[f]} / {FEATURE_MAX[f]}{FEATURE_UNITS[f]}</p>"
+                        f"</div>",
+                        unsafe_allow_html=True
+                    )
 
-        # ----------------------------
-        # Row 2: pH, Temperature, Humidity, Rainfall — Gauges + Cards
-        # ----------------------------
-        st.subheader(f"🌤️ Climate & Soil Conditions — {metric_label} Values")
-
-        cols2 = st.columns(len(features_row2), gap="medium")
-        for i, f in enumerate(features_row2):
-            with cols2[i]:
-                st.markdown(
-                    f"<div style='background-color:#CFE8C1; padding:15px; border-radius:18px; box-shadow: 0 4px 10px rgba(0,0,0,0.08);'>",
-                    unsafe_allow_html=True
-                )
-                fig = half_circle_gauge_card(calculated_values[f], feature_max[f], f, colors_row2[i], feature_units[f])
-                st.plotly_chart(fig, use_container_width=True)
-                st.markdown(
-                    f"<p style='text-align:center;font-weight:bold;color:black;'>{calculated_values[f]}{feature_units[f]} / {feature_max[f]}{feature_units[f]}</p>",
-                    unsafe_allow_html=True
-                )
-                st.markdown("</div>", unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        climate_labels = {
-            "ph":          "⚗️ pH Level",
-            "temperature": "🌡️ Temperature",
-            "humidity":    "💧 Humidity",
-            "rainfall":    "🌧️ Rainfall"
-        }
-        climate_card_cols = st.columns(4, gap="medium")
-        for i, f in enumerate(features_row2):
-            status_label, text_color, bg_color, role, meaning, action = get_climate_card(f, calculated_values[f])
-            with climate_card_cols[i]:
-                st.markdown(f"""
-                    <div style='
-                        background-color:{bg_color};
-                        border-left:6px solid {text_color};
-                        border-radius:16px;
-                        padding:20px 18px 16px 18px;
-                        box-shadow:0 4px 14px rgba(0,0,0,0.09);
-                        height:260px;
-                        box-sizing:border-box;
-                        overflow:hidden;
-                        display:flex;
-                        flex-direction:column;
-                        justify-content:space-between;
-                    '>
-                        <div>
-                            <div style='font-size:16px;font-weight:800;color:{text_color};margin-bottom:2px;'>
-                                {climate_labels[f]}
-                            </div>
-                            <div style='font-size:11px;color:#555;font-style:italic;margin-bottom:10px;'>
-                                {role}
-                            </div>
-                            <div style='
-                                display:inline-flex;
-                                align-items:center;
-                                gap:6px;
-                                background:{text_color};
-                                color:white;
-                                font-size:12px;
-                                font-weight:700;
-                                border-radius:24px;
-                                padding:4px 12px;
-                                margin-bottom:10px;
-                            '>
-                                {status_label}&nbsp;|&nbsp;{calculated_values[f]}{feature_units[f]}
-                            </div>
-                            <div style='font-size:12px;color:#222;line-height:1.55;'>
-                                {meaning}
-                            </div>
-                        </div>
-                        <div style='
-                            font-size:12px;
-                            color:{text_color};
-                            font-weight:700;
-                            border-top:1px solid {text_color}33;
-                            padding-top:8px;
-                            margin-top:8px;
-                        '>
-                            {action}
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
+            st.markdown("<br>", unsafe_allow_html=True)
+            for col, f in zip(st.columns(len(features), gap="medium"), features):
+                with col:
+                    render_feature_card(
+                        FEATURE_CARD_LABELS[f], get_card(f, calculated_values[f]),
+                        f"{calculated_values[f]}{FEATURE_UNITS[f]}", narrow=len(features) > 3
+                    )
+
+            st.markdown("---")
 
-        st.markdown("---")
         st.subheader("📈 Distribution Analysis")
            
         selected_param = st.selectbox(
                "View distribution for:",
-               features_row1 + features_row2,
-               format_func=lambda x: feature_names[x]
+               FEATURES_ALL,
+               format_func=lambda x: FEATURE_NAMES[x]
         )
         
-        param_mean = crop_df[selected_param].mean()
-        param_median = crop_df[selected_param].median()
+        param_mean = selected_stats[(selected_param, "mean")]
+        param_median = selected_stats[(selected_param, "median")]
            
-        fig = px.histogram(
-               crop_df, 
-               x=selected_param,
-               nbins=30,
-               title=f"{feature_names[selected_param]} Distribution for {selected_crop}",
-               color_discrete_sequence=['#4B371C']
-        )
-        fig.add_vline(x=param_mean, line_dash="dash", 
-                     line_color="red", annotation_text=f"Mean: {param_mean:.1f}")
-        fig.add_vline(x=param_median, line_dash="dot", 
-                     line_color="blue", annotation_text=f"Median: {param_median:.1f}")
+        fig = build_histogram_figure(selected_crop, selected_param, param_mean, param_median)
 
         with st.expander("🔍 **Understanding this Distribution**"):
             st.markdown(f"""
             **What this chart shows:**
-            This histogram displays how **{feature_names[selected_param]}** values are spread across all samples for **{selected_crop}**.
+            This histogram displays how **{FEATURE_NAMES[selected_param]}** values are spread across all samples for **{selected_crop}**.
         
             * **📊 Bars (Bins):** The height of each bar shows how many samples fall within that specific range.
-            * **🔴 Red Dashed Line:** This is the **Mean (Average)** = {param_mean:.1f}{feature_units[selected_param]}
-            * **🔵 Blue Dotted Line:** This is the **Median (Middle Value)** = {param_median:.1f}{feature_units[selected_param]}
+            * **🔴 Red Dashed Line:** This is the **Mean (Average)** = {param_mean:.1f}{FEATURE_UNITS[selected_param]}
+            * **🔵 Blue Dotted Line:** This is the **Median (Middle Value)** = {param_median:.1f}{FEATURE_UNITS[selected_param]}
             
             **How to interpret the lines:**
             * **Lines close together:** Data is symmetrically distributed, both measures are reliable
@@ -1072,211 +1342,268 @@ def show_trend():
         st.plotly_chart(fig, use_container_width=True)
 
     with tab2:
-        st.markdown(f"### Compare **{selected_crop.upper()}** {emoji} with Other Crops")
-        st.info("Select up to 3 crops to compare their optimal growing conditions side-by-side.")
+        render_crop_comparison(selected_crop, emoji, FEATURES_ALL, crop_list, crop_stats)
 
-        st.markdown("### 📊 Statistical Measure Selection")
-        col_t2_radio, col_t2_exp = st.columns([1, 2])
+@st.fragment
+def render_stage2_result(stage2_input, yield_pred, crop_key):
+    """Render the predicted yield cards and the complete-report download."""
+    crop_name = stage2_input["Crop_Type"]
+    remark = CROP_REMARKS.get(crop_key, DEFAULT_CROP_REMARK)
 
-        with col_t2_radio:
-            central_tendency_tab2 = st.radio(
-                "Choose calculation method:",
-                ("Mean", "Median"),
-                key="tab2_central_tendency",
-                help="Select how to calculate central values for the comparison crops"
-            )
+    total_kg = yield_pred * 1000
 
-        with col_t2_exp:
-            with st.expander("ℹ️ **What's the difference?**"):
-                st.markdown("""
-                **Mean (Average)** 📊
-                - Shows the average requirement across all samples for each crop
-                - **Best for:** Data without extreme outliers
+    st.markdown(f"""
+        <div class="prediction-card" style="background: linear-gradient(135deg, #ffffff 0%, #fafcf7 100%); color: white;">
+            <h2 style="color: white;">🎯 Predicted Yield: <strong>{yield_pred:.2f} t/ha</strong></h2>
+            <p style="color: black; opacity: 0.95;">{remark}</p>
+        </div>
+    """, unsafe_allow_html=True)
 
-                **Median (Middle Value)** 📍
-                - Shows the typical middle-ground requirement, less affected by unusual farming conditions or measurement errors
-                - **Best for:** Data with outliers or skewed distributions
+    # ── NEW: Yield breakdown explanation card ─────────────
+    st.markdown(f"""
+        <div style='
+            background-color:#f3f8ff;
+            border-left:5px solid #1565c0;
+            border-radius:12px;
+            padding:18px 22px;
+            margin:16px 0;
+            box-shadow:0 2px 8px rgba(0,0,0,0.07);
+        '>
+            <div style='font-size:15px;font-weight:700;color:#1565c0;margin-bottom:12px;'>
+                📊 What does {yield_pred:.2f} t/ha mean?
+            </div>
+            <div style='display:flex;gap:16px;flex-wrap:wrap;'>
+                <div style='
+                    flex:1;min-width:140px;
+                    background:white;border-radius:10px;
+                    padding:12px 16px;text-align:center;
+                    box-shadow:0 1px 4px rgba(0,0,0,0.08);
+                '>
+                    <div style='font-size:22px;font-weight:800;color:#1565c0;'>{yield_pred:.2f}</div>
+                    <div style='font-size:12px;color:#555;margin-top:2px;'>metric tonnes<br>per hectare</div>
+                </div>
+                <div style='
+                    flex:1;min-width:140px;
+                    background:white;border-radius:10px;
+                    padding:12px 16px;text-align:center;
+                    box-shadow:0 1px 4px rgba(0,0,0,0.08);
+                '>
+                    <div style='font-size:22px;font-weight:800;color:#2e7d32;'>{total_kg:,.0f}</div>
+                    <div style='font-size:12px;color:#555;margin-top:2px;'>kilograms<br>per hectare</div>
+                </div>
+                <div style='
+                    flex:1;min-width:140px;
+                    background:white;border-radius:10px;
+                    padding:12px 16px;text-align:center;
+                    box-shadow:0 1px 4px rgba(0,0,0,0.08);
+                '>
+                    <div style='font-size:22px;font-weight:800;color:#6a1b9a;'>{yield_pred * 10000:.0f}</div>
+                    <div style='font-size:12px;color:#555;margin-top:2px;'>square metres<br>= 1 hectare</div>
+                </div>
+            </div>
+            <div style='
+                margin-top:14px;
+                background:#e3f2fd;
+                border-radius:8px;
+                padding:10px 14px;
+                font-size:13px;
+                color:#1a237e;
+                line-height:1.6;
+            '>
+                💡 <strong>Scale it to your farm:</strong>
+                multiply the predicted yield by your farm size in hectares.<br>
+                e.g. farming <strong>5 ha</strong> → estimated harvest =
+                {yield_pred:.2f} × 5 = <strong>{yield_pred * 5:.2f} t
+                ({yield_pred * 5 * 1000:,.0f} kg)</strong>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+    # ── END yield breakdown card ──────────────────────────
+
+    # ── PDF DOWNLOAD — STAGE 2 ────────────────────────────
+    st.markdown("---")
+    # Deferred like the Stage 1 report: built only when the button is clicked
+    generated_at = datetime.now()
+    pdf_filename_full = f"crop_report_full_{crop_key}_{generated_at.strftime('%Y%m%d_%H%M%S')}.pdf"
+    st.download_button(
+        label="📄 Download Complete Report (PDF)",
+        data=partial(
+            report_pdf_or_error,
+            "Error generating full PDF report",
+            N=stage2_input["N"],
+            P=stage2_input["P"],
+            K=stage2_input["K"],
+            ph=stage2_input["ph"],
+            temperature=stage2_input["temperature"],
+            humidity=stage2_input["humidity"],
+            rainfall=stage2_input["rainfall"],
+            recommended_crop=crop_name,
+            thi=st.session_state.thi,
+            sfi=st.session_state.sfi,
+            parameter_matches=st.session_state.param_matches,
+            overall_match=st.session_state.overall_match,
+            soil_moisture=stage2_input["Soil_Moisture"],
+            soil_type=stage2_input["Soil_Type"],
+            sunlight_hours=stage2_input["Sunlight_Hours"],
+            irrigation_type=stage2_input["Irrigation_Type"],
+            fertilizer_used=stage2_input["Fertilizer_Used"],
+            pesticide_used=stage2_input["Pesticide_Used"],
+            predicted_yield=yield_pred,
+            generated_at=generated_at
+        ),
+        file_name=pdf_filename_full,
+        mime="application/pdf",
+        use_container_width=True,
+        type="primary"
+    )
 
-                ---
+@st.fragment
+def show_stage2():
+    """Render the Stage 2 yield prompt, form and result."""
+    crop_name = st.session_state.get("stage1_crop", "")
+    crop_key = crop_name.strip().lower() if isinstance(crop_name, str) else None
 
-                **🎯 When to use each:**
+    if crop_key not in STAGE2_CROPS:
+        return
+    if load_stage2() is None:
+        st.warning("⚠️ Stage 2 model not loaded. You can still get crop recommendation.")
+        return
 
-                | Situation | Recommended |
-                |-----------|-------------|
-                | Normal distribution | **Mean** |
-                | Data with outliers | **Median** |
-                | Extreme values present | **Median** |
-                | Symmetric data | **Mean** |
+    st.markdown("---")
 
-                > 💡 **Tip:** Changing this selector only affects the Crop Comparison tab. The Crop Overview tab has its own independent selector.
-                """)
+    if 'stage2_choice' not in st.session_state:
+        st.session_state.stage2_choice = "No"
 
-        if central_tendency_tab2 == "Mean":
-            calculated_values_tab2 = crop_df[features_row1 + features_row2].mean().round(1)
-            metric_label_tab2 = "Mean"
-        else:
-            calculated_values_tab2 = crop_df[features_row1 + features_row2].median().round(1)
-            metric_label_tab2 = "Median"
-
-        compare_crops = st.multiselect(
-            "🌾 Select crops to compare with " + selected_crop,
-            [c for c in sorted(df["label"].unique()) if c != selected_crop],
-            max_selections=3,
-            help="Choose crops you want to compare"
-        )
+    st.markdown(f"""
+        <div style='background-color:#FFFFFF; padding:20px; border-radius:10px; border-left:5px solid #4caf50; margin: 20px 0;'>
+            <h3 style='margin:0; color:#2e7d32;'>🌾 Yield Prediction Available</h3>
+            <p style='margin:5px 0 0 0; color:#555;'>Would you like to predict the yield for <strong>{crop_name}</strong>?</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    choice = st.radio(
+        "Do you want to predict yield for this crop?",
+        ("No", "Yes"),
+        key="stage2_choice"
+    )
+    
+    if st.session_state.stage2_choice == "Yes":
+
+        # ── Unit explanation expander ─────────────────────────────────
+        with st.expander("🪵 **Understanding the Yield Units**"):
+            st.markdown("""
+                <div style='
+                    background: linear-gradient(135deg, #e8f5e9, #f1f8e9);
+                    border-radius: 10px;
+                    padding: 16px 20px;
+                '>
+                    <div style='display:flex; gap:24px; flex-wrap:wrap;'>
+                        <div style='flex:1; min-width:160px;'>
+                            <div style='font-size:13px; font-weight:700; color:#1b5e20;'>🟩 1 Hectare (ha)</div>
+                            <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
+                                = 10,000 m² of land<br>
+                                ≈ the size of a standard football pitch<br>
+                                ≈ 2.47 acres
+                            </div>
+                        </div>
+                        <div style='flex:1; min-width:160px;'>
+                            <div style='font-size:13px; font-weight:700; color:#1b5e20;'>⚖️ 1 Metric Tonne (t)</div>
+                            <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
+                                = 1,000 kg of crop weight<br>
+                                ≈ 2,204 lbs<br>
+                                ≈ the weight of a small car
+                            </div>
+                        </div>
+                        <div style='flex:1; min-width:160px;'>
+                            <div style='font-size:13px; font-weight:700; color:#1b5e20;'>📦 Yield (t/ha)</div>
+                            <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
+                                = Metric tonnes harvested<br>per hectare of farmland<br>
+                                e.g. 3 t/ha → 3,000 kg per field of 10,000 m²
+                            </div>
+                        </div>
+                    </div>
+                    <div style='margin-top:12px; font-size:12px; color:#555; font-style:italic;'>
+                        💡 Example: If the model predicts <strong>4.5 t/ha</strong> and you farm <strong>3 hectares</strong>,
+                        your estimated total harvest = 4.5 × 3 = <strong>13.5 metric tonnes (13,500 kg)</strong>.
+                    </div>
+                </div>
+            """, unsafe_allow_html=True)
         
-        if compare_crops:
-            comparison_data = {"Crop": [selected_crop] + compare_crops}
-            for feature in features_row1 + features_row2:
-                comparison_data[feature_names[feature]] = [calculated_values_tab2[feature]]
-                for crop in compare_crops:
-                    if central_tendency_tab2 == "Mean":
-                        crop_value = df[df["label"] == crop][feature].mean()
-                    else:
-                        crop_value = df[df["label"] == crop][feature].median()
-                    comparison_data[feature_names[feature]].append(round(crop_value, 1))
-            
-            comp_df = pd.DataFrame(comparison_data)
-            
-            st.markdown(f"#### 📋 Comparison Table in Farm Environment Profile ({metric_label_tab2})")
-            st.dataframe(
-                comp_df, 
-                use_container_width=True, 
-                hide_index=True,
-                column_config={
-                    "Crop": st.column_config.TextColumn("🌱 Crop", width="medium"),
-                }
+
+        with st.form("stage2_form"):
+            st.subheader("📋 Additional Farm Parameters")
+            st.caption(
+                "💡 Reused from Stage 1: N={N}, P={P}, K={K}, pH={ph}, Temp={temperature}°C, "
+                "Humidity={humidity}%, Rainfall={rainfall}mm".format(**st.session_state.stage1_input)
             )
             
-            st.markdown("---")
-            st.markdown("#### 🌡️ Farm Environment Visual Comparison")
-            
-            col_viz1, col_viz2 = st.columns([1, 2])
-            with col_viz1:
-                selected_feature = st.selectbox(
-                    "Select parameter to visualize",
-                    [feature_names[f] for f in features_row1 + features_row2],
-                    help="Choose which parameter to compare visually"
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("##### **Soil & Environmental**")
+                soil_moisture = st.slider(
+                    "Soil Moisture (%)", 0, 100, 50,
+                    help="Current soil moisture content percentage"
                 )
-            with col_viz2:
-                chart_type = st.radio(
-                    "Chart Type",
-                    ["Bar Chart", "Radar Chart"],
-                    horizontal=True
+                soil_type = st.selectbox(
+                    "Soil Type", ["Loamy", "Sandy", "Silt", "Clay"],
+                    help="Primary soil composition type"
                 )
-            
-            if chart_type == "Bar Chart":
-                fig = px.bar(
-                    comp_df, 
-                    x="Crop", 
-                    y=selected_feature,
-                    title=f"{selected_feature} Comparison Across Crops ({metric_label_tab2})",
-                    color="Crop",
-                    text=selected_feature,
-                    color_discrete_sequence=px.colors.qualitative.Set2
+                sunlight_hours = st.number_input(
+                    "Sunlight Hours (hours/day)", 0.0, 24.0, 8.0, 0.5,
+                    help="Average daily sunlight exposure"
                 )
-                fig.update_traces(texttemplate='%{text}', textposition='outside')
-                fig.update_layout(showlegend=False, height=450, xaxis_title="Crop", yaxis_title=selected_feature)
-                with st.expander("📊 **Understanding the Bar Chart**"):
-                    st.markdown("""
-                        * This chart compares **Single Parameter Focus** requirements across the selected crops.
-                        * Use this to see exact numerical differences for a specific metric. 
-                        * It is the best way to determine which crop is the "most" or "least" demanding for a single nutrient.
-                    """)
-                st.plotly_chart(fig, use_container_width=True)
             
-            else:
-                categories = [feature_names[f] for f in features_row1 + features_row2]
-                fig = go.Figure()
-                for idx, crop in enumerate([selected_crop] + compare_crops):
-                    crop_data = comp_df[comp_df["Crop"] == crop]
-                    values = [(crop_data[feature_names[feature]].values[0] / feature_max[feature])
-                              for feature in features_row1 + features_row2]
-                    fig.add_trace(go.Scatterpolar(
-                        r=values, theta=categories, fill='toself', name=crop, line=dict(width=2)
-                    ))
-                fig.update_layout(
-                    polar=dict(radialaxis=dict(visible=True, range=[0, 1], tickformat='.0%')),
-                    showlegend=True,
-                    title=f"Normalized Multi-Parameter Comparison ({metric_label_tab2})",
-                    height=500
+            with col2:
+                st.markdown("##### **Farm Management**")
+                irrigation_type = st.selectbox(
+                    "Irrigation Type", ["Drip", "Canal", "Rainfed", "Sprinkler"],
+                    help="Primary irrigation method used"
                 )
-                with st.expander("📊 **Understanding the Radar Chart**"):
-                    st.markdown("""
-                            * This chart **normalizes** all values (0% to 100%) so you can compare temperature, pH, and nutrients on the same scale.
-                            * **What to look for:** If the shapes of two crops overlap significantly, they share a similar "biological fingerprint" and likely grow well in the same regions.
-                    """)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            st.markdown("#### 🔍 Key Differences")
-            with st.expander("ℹ️ **How to interpret these differences**"):
-                st.markdown(f"""
-                This section highlights where the comparison crops **deviate significantly** from your primary choice, **{selected_crop.upper()}**.
-                
-                * **The 20% Rule:** We only display a difference if it is greater than **20%**. This filters out minor variations and focuses on the factors that truly change how you manage the field.
-                * **🔺 (Red Up):** Indicates the comparison crop requires **significantly more** of this resource.
-                * **🔻 (Red Down):** Indicates the comparison crop requires **significantly less**.
-                
-                **Why this matters:** If you see a **+80% Nitrogen** difference, switching to that crop would require a complete overhaul of your fertilization schedule.
-                """)
-                st.latex(r"Percentage\ Change = \frac{Comparison\ Mean - Selected\ Mean}{Selected\ Mean} \times 100")
-                
-            diff_cols = st.columns(len(compare_crops))
-            for idx, crop in enumerate(compare_crops):
-                with diff_cols[idx]:
-                    crop_emoji = crop_emojis.get(crop.lower(), "🌱")
-                    st.markdown(f"**{crop_emoji} {crop.upper()} vs {selected_crop.upper()}**")
-                    if central_tendency_tab2 == "Mean":
-                        crop_data = df[df["label"] == crop][features_row1 + features_row2].mean()
-                    else:
-                        crop_data = df[df["label"] == crop][features_row1 + features_row2].median()
-                    differences = []
-                    for feature in features_row1 + features_row2:
-                        diff = crop_data[feature] - calculated_values_tab2[feature]
-                        pct_diff = (diff / calculated_values_tab2[feature] * 100) if calculated_values_tab2[feature] != 0 else 0
-                        if abs(pct_diff) > 20:
-                            if diff > 0:
-                                differences.append(f"🔺 {feature_names[feature]}: +{pct_diff:.0f}%")
-                            else:
-                                differences.append(f"🔻 {feature_names[feature]}: {pct_diff:.0f}%")
-                    if differences:
-                        for diff in differences[:3]:
-                            st.caption(diff)
-                    else:
-                        st.caption("Similar conditions")
-            
+                fertilizer_used = st.number_input(
+                    "Fertilizer Used (kg/hectare)", 0.0, 500.0, 100.0, 10.0,
+                    help="Amount of fertilizer applied per hectare of farmland"
+                )
+                pesticide_used = st.number_input(
+                    "Pesticide Used (kg/hectare)", 0.0, 50.0, 5.0, 0.5,
+                    help="Amount of pesticide applied per hectare of farmland"
+                )
+
             st.markdown("---")
-            st.markdown("#### 🎯 Similarity Analysis")
-            for crop in compare_crops:
-               if central_tendency_tab2 == "Mean":
-                   crop_data = df[df["label"] == crop][features_row1 + features_row2].mean()
-               else:
-                   crop_data = df[df["label"] == crop][features_row1 + features_row2].median()
-               differences = []
-               for feature in features_row1 + features_row2:
-                   diff = abs(crop_data[feature] - calculated_values_tab2[feature])
-                   norm_diff = diff / feature_max[feature]
-                   differences.append(norm_diff)
-               similarity = (1 - sum(differences) / len(differences)) * 100
-               crop_emoji = crop_emojis.get(crop.lower(), "🌱")
-               st.progress(similarity / 100)
-               st.caption(f"{crop_emoji} **{crop}** is {similarity:.1f}% similar to **{selected_crop}**")
+            submit_stage2 = st.form_submit_button("✨  Predict Yield")
         
-        else:
-            st.warning("👆 Select at least one crop to start comparing!")
+        if submit_stage2:
+            stage2_input = {
+                **st.session_state.stage1_input,
+                "Soil_Moisture":   soil_moisture,
+                "Sunlight_Hours":  sunlight_hours,
+                "Fertilizer_Used": fertilizer_used,
+                "Pesticide_Used":  pesticide_used,
+                "Soil_Type":       soil_type,
+                "Irrigation_Type": irrigation_type,
+                "Crop_Type":       crop_name,
+            }
+            
+            try:
+                yield_pred = predict_yield(tuple(stage2_input.items()))
+                
+                render_stage2_result(stage2_input, yield_pred, crop_key)
+                st.balloons()
+
+            except Exception as e:
+                st.error(f"❌ Error predicting yield: {str(e)}")
+                with st.expander("Debug Info"):
+                    st.write("Input data:")
+                    st.json(stage2_input)
 
+@st.fragment
 def show_prediction():
     st.title("🌱 Intelligent Crop Recommendation")
     
-    stage1_model, le = load_stage1()
-    stage2_model = load_stage2()
+    stage1_model, crop_classes = load_stage1()
     
-    if stage1_model is None or le is None:
+    if stage1_model is None or crop_classes is None:
         st.error("🚨 Stage 1 model files missing.")
         return
-    if stage2_model is None:
-        st.warning("⚠️ Stage 2 model not loaded. You can still get crop recommendation.")
 
     with st.expander("📖 **How to Use This System?**"):
         m1, m2 = st.columns(2)
@@ -1347,24 +1674,13 @@ def show_prediction():
 
     if submit:
         # Stage 1: Crop Recommendation
-        input_stage1 = np.array([[N, P, K, temp, hum, ph, rain]])
-        crop_encoded = stage1_model.predict(input_stage1)[0]
-        crop_name = le.inverse_transform([crop_encoded])[0]
+        crop_name = predict_crop(N, P, K, temp, hum, ph, rain)
         
         st.session_state.stage1_crop = crop_name
         st.session_state.stage1_input = {"N": N, "P": P, "K": K, "temperature": temp, "humidity": hum, "ph": ph, "rainfall": rain}
         st.session_state.submitted = True
         
-        crop_emojis = {
-            "rice":"🌾", "wheat":"🌾", "maize":"🌽", "jute":"🌿",
-            "cotton":"☁️", "coconut":"🥥", "papaya":"🍈", "orange":"🍊",
-            "apple":"🍎", "muskmelon":"🍈", "watermelon":"🍉", "grapes":"🍇",
-            "mango":"🥭", "banana":"🍌", "pomegranate":"💎", "lentil":"🫘",
-            "blackgram":"⚫", "mungbean":"🟢", "mothbeans":"🫘", "pigeonpeas":"🫘",
-            "kidneybeans":"🫘", "chickpea":"🫘", "coffee":"☕"
-        }
-        
-        emoji = crop_emojis.get(crop_name.lower(), "🌱")
+        emoji = CROP_EMOJIS.get(crop_name.lower(), "🌱")
     
         st.markdown(f"""
             <div class="prediction-card">
@@ -1376,14 +1692,8 @@ def show_prediction():
 
         st.balloons()
         st.subheader("📊 Suggestion Improvement")
-        df = load_data()
-        crop_data = df[df["label"] == crop_name]
-        
-        # Calculate mode (most frequently used values) for each numeric parameter
-        crop_frequently_used = {}
-        for col in ["N", "P", "K", "temperature", "humidity", "ph", "rainfall"]:
-            mode_values = crop_data[col].mode()
-            crop_frequently_used[col] = mode_values[0] if len(mode_values) > 0 else crop_data[col].mean()
+        # Mode (most frequently used value) of each numeric parameter for this crop
+        crop_frequently_used = load_crop_modes()[crop_name]
         
         # Calculate indices
         thi = temp - (0.55 - 0.0055 * hum) * (temp - 14.4)
@@ -1448,25 +1758,17 @@ def show_prediction():
         # ── MATCH SCORE SECTION ───────────────────────────────────────────────
         st.markdown("##### 🎯 Frequently Used Parameter Match Score")
 
-        PARAM_RANGES = {
-            "Nitrogen (N)":   150,
-            "Phosphorus (P)": 150,
-            "Potassium (K)":  150,
-            "pH Level":       14,
-            "Temperature":    50,
-            "Humidity":       100,
-            "Rainfall":       300,
-        }
-
-        params = {
-            "Nitrogen (N)":   (N,    crop_frequently_used["N"],           150),
-            "Phosphorus (P)": (P,    crop_frequently_used["P"],           150),
-            "Potassium (K)":  (K,    crop_frequently_used["K"],           150),
-            "pH Level":       (ph,   crop_frequently_used["ph"],          14),
-            "Temperature":    (temp, crop_frequently_used["temperature"],  50),
-            "Humidity":       (hum,  crop_frequently_used["humidity"],    100),
-            "Rainfall":       (rain, crop_frequently_used["rainfall"],    300),
+        # All seven match percentages in one vector: display, average and PDF reuse it
+        user_vals = (N, P, K, ph, temp, hum, rain)
+        freq_vals = tuple(crop_frequently_used[f] for f in FEATURES_ALL)
+        match_pcts = np.clip(
+            (1 - np.abs(np.subtract(user_vals, freq_vals)) / list(PARAM_RANGES.values())) * 100, 0, 100
+        )
+        param_matches_dict = {
+            param_name: (user_val, freq_val, pct)
+            for param_name, user_val, freq_val, pct in zip(PARAM_RANGES, user_vals, freq_vals, match_pcts.tolist())
         }
+        avg_match = float(match_pcts.mean())
 
         with st.expander("ℹ️ **How is the Match Score calculated?**"):
             st.markdown("""
@@ -1490,12 +1792,11 @@ def show_prediction():
             """)
 
         col_left, col_right = st.columns(2)
-        param_items = list(params.items())
+        param_items = list(param_matches_dict.items())
         mid_point = len(param_items) // 2 + len(param_items) % 2
 
-        def render_param_bar(param_name, user_val, freq_val, scale_range):
-            match_pct = (1 - abs(user_val - freq_val) / scale_range) * 100
-            match_pct = max(0, min(100, match_pct))
+        # One HTML block per column (CSS progress bars) instead of four elements per parameter
+        def param_bar_html(param_name, user_val, freq_val, match_pct):
             if match_pct >= 80:
                 color = "🟢"
             elif match_pct >= 50:
@@ -1504,357 +1805,77 @@ def show_prediction():
                 color = "🔴"
             diff = user_val - freq_val
             diff_str = f"+{diff:.1f}" if diff > 0 else f"{diff:.1f}"
-            st.markdown(f"**{color} {param_name}**")
-            st.progress(match_pct / 100)
-            st.caption(
-                f"Your: **{user_val:.1f}** | Typical: **{freq_val:.1f}** | "
-                f"Diff: {diff_str} | Match: **{match_pct:.0f}%**"
+            return (
+                f"<div style='margin-bottom:28px;'>"
+                f"<p style='margin:0 0 8px 0;'><b>{color} {param_name}</b></p>"
+                f"<div style='background:#f0f2f6; border-radius:4px; height:8px;'>"
+                f"<div style='width:{match_pct:.1f}%; background:#ff4b4b; border-radius:4px; height:8px;'></div></div>"
+                f"<p style='margin:8px 0 0 0; font-size:14px; color:rgba(49,51,63,0.6);'>"
+                f"Your: <b>{user_val:.1f}</b> | Typical: <b>{freq_val:.1f}</b> | "
+                f"Diff: {diff_str} | Match: <b>{match_pct:.0f}%</b></p>"
+                f"</div>"
             )
-            st.markdown("<br>", unsafe_allow_html=True)
-            return match_pct
-
-        overall_matches = []
-        param_matches_dict = {}
 
         with col_left:
-            for param_name, (user_val, freq_val, scale_range) in param_items[:mid_point]:
-                pct = render_param_bar(param_name, user_val, freq_val, scale_range)
-                overall_matches.append(pct)
-                param_matches_dict[param_name] = (user_val, freq_val, pct)
+            st.markdown(
+                "".join(param_bar_html(name, user_val, freq_val, pct)
+                        for name, (user_val, freq_val, pct) in param_items[:mid_point]),
+                unsafe_allow_html=True
+            )
 
         with col_right:
-            for param_name, (user_val, freq_val, scale_range) in param_items[mid_point:]:
-                pct = render_param_bar(param_name, user_val, freq_val, scale_range)
-                overall_matches.append(pct)
-                param_matches_dict[param_name] = (user_val, freq_val, pct)
-
-        avg_match = sum(overall_matches) / len(overall_matches)
+            st.markdown(
+                "".join(param_bar_html(name, user_val, freq_val, pct)
+                        for name, (user_val, freq_val, pct) in param_items[mid_point:]),
+                unsafe_allow_html=True
+            )
 
         # Store in session state for PDF generation
         st.session_state.overall_match = avg_match
         st.session_state.param_matches = param_matches_dict
 
-        if avg_match >= 90:
-            match_emoji = "🌟"
-            match_text = "Excellent Match!"
-            match_color = "#2ecc71"
-        elif avg_match >= 75:
-            match_emoji = "👍"
-            match_text = "Good Match"
-            match_color = "#27ae60"
-        elif avg_match >= 60:
-            match_emoji = "⚠️"
-            match_text = "Fair Match"
-            match_color = "#f39c12"
-        else:
-            match_emoji = "❗"
-            match_text = "Needs Adjustment"
-            match_color = "#e74c3c"
+        match_emoji, match_text, match_message, match_color = MATCH_BANNER[bisect_right(MATCH_BOUNDS, avg_match)]
 
         st.markdown(f"""
             <div style='background-color:{match_color}22; padding:20px; border-radius:10px; text-align:center; border:2px solid {match_color};'>
                 <h3 style='color:{match_color}; margin:0;'>{match_emoji} Overall Match: {avg_match:.1f}%</h3>
                 <p style='margin:5px 0; font-size:16px;'><b>{match_text}</b></p>
                 <p style='margin:0; font-size:14px; color:#666;'>
-                    {'Your conditions are very close to frequently used values!' if avg_match >= 90 else
-                     'Your conditions are good for this crop.' if avg_match >= 75 else
-                     'Consider adjusting some parameters for better yield.' if avg_match >= 60 else
-                     'Several parameters need adjustment for optimal growth.'}
+                    {match_message}
                 </p>
             </div>
         """, unsafe_allow_html=True)
 
         # ── PDF DOWNLOAD — STAGE 1 ────────────────────────────────────────────
         st.markdown("---")
-        try:
-            pdf_filename = f"crop_report_{crop_name.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            pdf_buffer = create_crop_prediction_pdf(
+        # Deferred: Streamlit calls `data` only when the button is clicked, so the PDF
+        # is not built for users who never download it
+        generated_at = datetime.now()
+        pdf_filename = f"crop_report_{crop_name.lower()}_{generated_at.strftime('%Y%m%d_%H%M%S')}.pdf"
+        st.download_button(
+            label="📄 Download Stage 1 Report (PDF)",
+            data=partial(
+                report_pdf_or_error,
+                "Error generating PDF",
                 N=N, P=P, K=K, ph=ph,
                 temperature=temp, humidity=hum, rainfall=rain,
                 recommended_crop=crop_name,
                 thi=thi, sfi=sfi,
                 parameter_matches=param_matches_dict,
-                overall_match=avg_match
-            )
-            st.download_button(
-                label="📄 Download Stage 1 Report (PDF)",
-                data=pdf_buffer,
-                file_name=pdf_filename,
-                mime="application/pdf",
-                use_container_width=True,
-                type="primary"
-            )
-        except Exception as e:
-            st.error(f"Error generating PDF: {str(e)}")
+                overall_match=avg_match,
+                generated_at=generated_at
+            ),
+            file_name=pdf_filename,
+            mime="application/pdf",
+            use_container_width=True,
+            type="primary"
+        )
 
     # ── STAGE 2: YIELD PREDICTION ─────────────────────────────────────────────
-    # if st.session_state.get('submitted', False):
-    #     crop_name = st.session_state.stage1_crop
-    #     allowed_crops = ["rice", "maize", "cotton"]
-        
-    #     if crop_name.strip().lower() in allowed_crops and stage2_model is not None:
-    
+    # Stage 2 is loaded only once there is a Stage 1 result to build on
     if st.session_state.get('submitted', False):
-        crop_name = st.session_state.get("stage1_crop", "")
-        allowed_crops = ["rice", "maize", "cotton"]
-    
-        if isinstance(crop_name, str) and crop_name.strip().lower() in allowed_crops and stage2_model is not None:
-            st.markdown("---")
-
-            if 'stage2_choice' not in st.session_state:
-                st.session_state.stage2_choice = "No"
-
-            st.markdown(f"""
-                <div style='background-color:#FFFFFF; padding:20px; border-radius:10px; border-left:5px solid #4caf50; margin: 20px 0;'>
-                    <h3 style='margin:0; color:#2e7d32;'>🌾 Yield Prediction Available</h3>
-                    <p style='margin:5px 0 0 0; color:#555;'>Would you like to predict the yield for <strong>{crop_name}</strong>?</p>
-                </div>
-            """, unsafe_allow_html=True)
-
-            choice = st.radio(
-                "Do you want to predict yield for this crop?",
-                ("No", "Yes"),
-                key="stage2_choice"
-            )
-            
-            if st.session_state.stage2_choice == "Yes":
-
-                # ── Unit explanation expander ─────────────────────────────────
-                with st.expander("🪵 **Understanding the Yield Units**"):
-                    st.markdown("""
-                        <div style='
-                            background: linear-gradient(135deg, #e8f5e9, #f1f8e9);
-                            border-radius: 10px;
-                            padding: 16px 20px;
-                        '>
-                            <div style='display:flex; gap:24px; flex-wrap:wrap;'>
-                                <div style='flex:1; min-width:160px;'>
-                                    <div style='font-size:13px; font-weight:700; color:#1b5e20;'>🟩 1 Hectare (ha)</div>
-                                    <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
-                                        = 10,000 m² of land<br>
-                                        ≈ the size of a standard football pitch<br>
-                                        ≈ 2.47 acres
-                                    </div>
-                                </div>
-                                <div style='flex:1; min-width:160px;'>
-                                    <div style='font-size:13px; font-weight:700; color:#1b5e20;'>⚖️ 1 Metric Tonne (t)</div>
-                                    <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
-                                        = 1,000 kg of crop weight<br>
-                                        ≈ 2,204 lbs<br>
-                                        ≈ the weight of a small car
-                                    </div>
-                                </div>
-                                <div style='flex:1; min-width:160px;'>
-                                    <div style='font-size:13px; font-weight:700; color:#1b5e20;'>📦 Yield (t/ha)</div>
-                                    <div style='font-size:12.5px; color:#333; margin-top:4px; line-height:1.6;'>
-                                        = Metric tonnes harvested<br>per hectare of farmland<br>
-                                        e.g. 3 t/ha → 3,000 kg per field of 10,000 m²
-                                    </div>
-                                </div>
-                            </div>
-                            <div style='margin-top:12px; font-size:12px; color:#555; font-style:italic;'>
-                                💡 Example: If the model predicts <strong>4.5 t/ha</strong> and you farm <strong>3 hectares</strong>,
-                                your estimated total harvest = 4.5 × 3 = <strong>13.5 metric tonnes (13,500 kg)</strong>.
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
+        show_stage2()
 
-                with st.form("stage2_form"):
-                    st.subheader("📋 Additional Farm Parameters")
-                    st.caption("💡 Reused from Stage 1: N={}, P={}, K={}, pH={}, Temp={}°C, Humidity={}%, Rainfall={}mm".format(
-                        st.session_state.stage1_input["N"],
-                        st.session_state.stage1_input["P"],
-                        st.session_state.stage1_input["K"],
-                        st.session_state.stage1_input["ph"],
-                        st.session_state.stage1_input["temperature"],
-                        st.session_state.stage1_input["humidity"],
-                        st.session_state.stage1_input["rainfall"]
-                    ))
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("##### **Soil & Environmental**")
-                        soil_moisture = st.slider(
-                            "Soil Moisture (%)", 0, 100, 50,
-                            help="Current soil moisture content percentage"
-                        )
-                        soil_type = st.selectbox(
-                            "Soil Type", ["Loamy", "Sandy", "Silt", "Clay"],
-                            help="Primary soil composition type"
-                        )
-                        sunlight_hours = st.number_input(
-                            "Sunlight Hours (hours/day)", 0.0, 24.0, 8.0, 0.5,
-                            help="Average daily sunlight exposure"
-                        )
-                    
-                    with col2:
-                        st.markdown("##### **Farm Management**")
-                        irrigation_type = st.selectbox(
-                            "Irrigation Type", ["Drip", "Canal", "Rainfed", "Sprinkler"],
-                            help="Primary irrigation method used"
-                        )
-                        fertilizer_used = st.number_input(
-                            "Fertilizer Used (kg/hectare)", 0.0, 500.0, 100.0, 10.0,
-                            help="Amount of fertilizer applied per hectare of farmland"
-                        )
-                        pesticide_used = st.number_input(
-                            "Pesticide Used (kg/hectare)", 0.0, 50.0, 5.0, 0.5,
-                            help="Amount of pesticide applied per hectare of farmland"
-                        )
-
-                    st.markdown("---")
-                    submit_stage2 = st.form_submit_button("✨  Predict Yield")
-                
-                if submit_stage2:
-                    stage2_input = {
-                        "N":               st.session_state.stage1_input["N"],
-                        "P":               st.session_state.stage1_input["P"],
-                        "K":               st.session_state.stage1_input["K"],
-                        "ph":              st.session_state.stage1_input["ph"],
-                        "temperature":     st.session_state.stage1_input["temperature"],
-                        "humidity":        st.session_state.stage1_input["humidity"],
-                        "rainfall":        st.session_state.stage1_input["rainfall"],
-                        "Soil_Moisture":   soil_moisture,
-                        "Sunlight_Hours":  sunlight_hours,
-                        "Fertilizer_Used": fertilizer_used,
-                        "Pesticide_Used":  pesticide_used,
-                        "Soil_Type":       soil_type,
-                        "Irrigation_Type": irrigation_type,
-                        "Crop_Type":       crop_name,
-                    }
-                    
-                    stage2_input_df = pd.DataFrame([stage2_input])
-                    
-                    try:
-                        yield_pred = stage2_model.predict(stage2_input_df)[0]
-                        
-                        crop_remarks = {
-                            "rice":   "Rice thrives with high nitrogen and consistent water management. Your predicted yield reflects optimal flooded conditions and balanced nutrients.",
-                            "maize":  "Maize requires balanced NPK nutrients and adequate sunlight. Ensure proper spacing and weed control for maximum yield.",
-                            "cotton": "Cotton needs sufficient potassium for fiber quality. Monitor for pests and ensure adequate irrigation during flowering stage."
-                        }
-                        remark = crop_remarks.get(crop_name.lower(), "Ensure proper soil fertility and climate management for best yield.")
-
-                        total_kg = yield_pred * 1000
-
-                        st.markdown(f"""
-                            <div class="prediction-card" style="background: linear-gradient(135deg, #ffffff 0%, #fafcf7 100%); color: white;">
-                                <h2 style="color: white;">🎯 Predicted Yield: <strong>{yield_pred:.2f} t/ha</strong></h2>
-                                <p style="color: black; opacity: 0.95;">{remark}</p>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                        # ── NEW: Yield breakdown explanation card ─────────────
-                        st.markdown(f"""
-                            <div style='
-                                background-color:#f3f8ff;
-                                border-left:5px solid #1565c0;
-                                border-radius:12px;
-                                padding:18px 22px;
-                                margin:16px 0;
-                                box-shadow:0 2px 8px rgba(0,0,0,0.07);
-                            '>
-                                <div style='font-size:15px;font-weight:700;color:#1565c0;margin-bottom:12px;'>
-                                    📊 What does {yield_pred:.2f} t/ha mean?
-                                </div>
-                                <div style='display:flex;gap:16px;flex-wrap:wrap;'>
-                                    <div style='
-                                        flex:1;min-width:140px;
-                                        background:white;border-radius:10px;
-                                        padding:12px 16px;text-align:center;
-                                        box-shadow:0 1px 4px rgba(0,0,0,0.08);
-                                    '>
-                                        <div style='font-size:22px;font-weight:800;color:#1565c0;'>{yield_pred:.2f}</div>
-                                        <div style='font-size:12px;color:#555;margin-top:2px;'>metric tonnes<br>per hectare</div>
-                                    </div>
-                                    <div style='
-                                        flex:1;min-width:140px;
-                                        background:white;border-radius:10px;
-                                        padding:12px 16px;text-align:center;
-                                        box-shadow:0 1px 4px rgba(0,0,0,0.08);
-                                    '>
-                                        <div style='font-size:22px;font-weight:800;color:#2e7d32;'>{total_kg:,.0f}</div>
-                                        <div style='font-size:12px;color:#555;margin-top:2px;'>kilograms<br>per hectare</div>
-                                    </div>
-                                    <div style='
-                                        flex:1;min-width:140px;
-                                        background:white;border-radius:10px;
-                                        padding:12px 16px;text-align:center;
-                                        box-shadow:0 1px 4px rgba(0,0,0,0.08);
-                                    '>
-                                        <div style='font-size:22px;font-weight:800;color:#6a1b9a;'>{yield_pred * 10000:.0f}</div>
-                                        <div style='font-size:12px;color:#555;margin-top:2px;'>square metres<br>= 1 hectare</div>
-                                    </div>
-                                </div>
-                                <div style='
-                                    margin-top:14px;
-                                    background:#e3f2fd;
-                                    border-radius:8px;
-                                    padding:10px 14px;
-                                    font-size:13px;
-                                    color:#1a237e;
-                                    line-height:1.6;
-                                '>
-                                    💡 <strong>Scale it to your farm:</strong>
-                                    multiply the predicted yield by your farm size in hectares.<br>
-                                    e.g. farming <strong>5 ha</strong> → estimated harvest =
-                                    {yield_pred:.2f} × 5 = <strong>{yield_pred * 5:.2f} t
-                                    ({yield_pred * 5 * 1000:,.0f} kg)</strong>
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-                        # ── END yield breakdown card ──────────────────────────
-
-                        st.balloons()
-                        
-                        # ── PDF DOWNLOAD — STAGE 2 ────────────────────────────
-                        st.markdown("---")
-                        try:
-                            pdf_filename_full = f"crop_report_full_{crop_name.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                            pdf_buffer_full = create_crop_prediction_pdf(
-                                N=st.session_state.stage1_input["N"],
-                                P=st.session_state.stage1_input["P"],
-                                K=st.session_state.stage1_input["K"],
-                                ph=st.session_state.stage1_input["ph"],
-                                temperature=st.session_state.stage1_input["temperature"],
-                                humidity=st.session_state.stage1_input["humidity"],
-                                rainfall=st.session_state.stage1_input["rainfall"],
-                                recommended_crop=crop_name,
-                                thi=st.session_state.thi,
-                                sfi=st.session_state.sfi,
-                                parameter_matches=st.session_state.param_matches,
-                                overall_match=st.session_state.overall_match,
-                                soil_moisture=soil_moisture,
-                                soil_type=soil_type,
-                                sunlight_hours=sunlight_hours,
-                                irrigation_type=irrigation_type,
-                                fertilizer_used=fertilizer_used,
-                                pesticide_used=pesticide_used,
-                                predicted_yield=yield_pred
-                            )
-                            st.download_button(
-                                label="📄 Download Complete Report (PDF)",
-                                data=pdf_buffer_full,
-                                file_name=pdf_filename_full,
-                                mime="application/pdf",
-                                use_container_width=True,
-                                type="primary"
-                            )
-                        except Exception as e:
-                            st.error(f"Error generating full PDF report: {str(e)}")
-                        
-                    except Exception as e:
-                        st.error(f"❌ Error predicting yield: {str(e)}")
-                        with st.expander("Debug Info"):
-                            st.write("Input data:")
-                            st.json(stage2_input)
-        
-        # elif crop_name.strip().lower() not in allowed_crops:
-        #     pass
-        elif isinstance(crop_name, str) and crop_name.strip().lower() not in allowed_crops:
-            pass
-                          
 # =============================
 # MAIN NAVIGATION
 # =============================